@@ -0,0 +1,61 @@
+import copy
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from core.cache import LRUCache, bump_cache_version, get_cache_version
+
+token_cache = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE, timeout=settings.TOKEN_CACHE_TIMEOUT)
+
+
+def token_version_name(user_id):
+    """
+    Returns the version name of the cached tokens of the given user.
+    """
+    return f'tokens:{user_id}'
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that keeps recently used tokens in memory.
+
+    A token is loaded once together with its user and profile, so neither
+    the authentication nor the permission checks on 'request.user.profile'
+    query the database while the token is cached. Entries expire after
+    TOKEN_CACHE_TIMEOUT seconds and are dropped when the token is deleted
+    or its user or profile changes (see app_auth.signals).
+
+    Entries are kept per process, so each one also carries the version
+    stamp of its user (core.cache) and is only used while that stamp is
+    unchanged. Deleting a token or changing its user in any worker bumps the
+    stamp in the shared cache and revokes the token in every worker.
+    Every request gets its own copy of the cached user.
+    """
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            user, token, version = cached
+            if get_cache_version(token_version_name(user.pk)) != version:
+                cached = None
+        if cached is None:
+            try:
+                token = self.get_model().objects.select_related('user__profile').get(key=key)
+            except self.get_model().DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+            # the user is only known now; a change committed between the query
+            # and this read is missed until the entry expires
+            cached = (token.user, token, get_cache_version(token_version_name(token.user_id)))
+            token_cache.set(key, cached)
+        return copy.deepcopy(cached[:2])
+
+
+def invalidate_user_tokens(user_id):
+    """
+    Drops the cached tokens of the given user in every process.
+    """
+    bump_cache_version(token_version_name(user_id))
+    token_cache.delete_matching(lambda cached: cached[0].pk == user_id)
@@ -0,0 +1,32 @@
+from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
+
+from app_auth.models import UserProfile
+
+
+class BusinessProfileFilter(filters.FilterSet):
+    """
+    FilterSet for filtering business profiles by their ranking counters.
+    All filters work on the indexed counter columns of UserProfile.
+    """
+    min_rating = filters.NumberFilter(field_name='average_rating', lookup_expr='gte')
+    min_review_count = filters.NumberFilter(field_name='review_count', lookup_expr='gte')
+    min_completed_orders = filters.NumberFilter(field_name='completed_order_count', lookup_expr='gte')
+
+    class Meta:
+        model = UserProfile
+        fields = ['min_rating', 'min_review_count', 'min_completed_orders']
+
+
+class TieBreakingOrderingFilter(OrderingFilter):
+    """
+    Ordering filter that appends 'id' in the direction of the last term, so
+    rows with equal values keep a stable order across pages and the
+    (type, counter) indexes, which end in the row id, cover the whole ordering.
+    """
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and ordering[-1].lstrip('-') not in ['id', 'pk']:
+            direction = '-' if ordering[-1].startswith('-') else ''
+            ordering = [*ordering, f'{direction}id']
+        return ordering
@@ -5,6 +5,9 @@ from django.contrib.auth.models import User
 from rest_framework import serializers
 
 from app_auth.models import UserProfile
+from app_reviews.models import BusinessReviewStats
+from core.images import DerivativeURLsField
+from core.serializers import SparseFieldsetMixin
 
 
 class UserInfoSerializer(serializers.ModelSerializer):
@@ -82,12 +85,13 @@ class RegistrationSerializer(serializers.ModelSerializer):
         return account
 
 
-class UserDetailSerializer(serializers.ModelSerializer):
+class UserDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for detailed user information.
 
     Maps UserProfile model fields to serializer fields including
     user-related info (id, username, email, first and last name).
+    Read requests support '?fields=' and '?omit='.
 
     Overrides update() to handle nested user fields update.
     """
@@ -133,12 +137,23 @@ class UserBusinessListSerializer(UserDetailSerializer):
     """
     Serializer for listing business users.
     """
+    sparse_field_sources = {
+        'rating_histogram': [f'user__review_stats__rating_{rating}' for rating in range(1, 6)],
+    }
+    file_derivatives = DerivativeURLsField(storage_field='file', help_text="URLs of the resized image versions by size name.")
+    average_rating = serializers.DecimalField(read_only=True, max_digits=2, decimal_places=1, coerce_to_string=False, help_text="Average rating of the business user's reviews.")
+    rating_histogram = serializers.SerializerMethodField(help_text="Number of reviews per rating, keyed '1' to '5'.")
+
     class Meta:
         model = UserProfile
         fields = ['user', 'username', 'first_name', 'last_name',
-                'file', 'location', 'tel', 'description', 'working_hours', 'type']
+                'file', 'file_derivatives', 'location', 'tel', 'description', 'working_hours', 'type',
+                'review_count', 'average_rating', 'rating_histogram', 'completed_order_count']
         read_only_fields = fields
 
+    def get_rating_histogram(self, obj) -> dict:
+        return BusinessReviewStats.for_user(obj.user).rating_histogram
+
 
 class UserCustomerListSerializer(UserDetailSerializer):
     """
@@ -9,12 +9,17 @@ from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
+from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 
 # 3. Local application
 from .serializers import RegistrationSerializer, UserDetailSerializer, UserBusinessListSerializer, UserCustomerListSerializer
 from .permissions import IsProfileOwner
+from .filters import BusinessProfileFilter, TieBreakingOrderingFilter
 from app_auth.models import UserProfile
+from core.pagination import StandardResultsSetPagination
+from core.serializers import SPARSE_FIELDSET_PARAMETERS
+from core.views import SparseFieldsetViewMixin
 
 
 @extend_schema(
@@ -109,13 +114,14 @@ class LoginView(APIView):
 @extend_schema(
     tags=['Profile'],
     description="Lists user profile. You have to be authenticated.",
+    parameters=SPARSE_FIELDSET_PARAMETERS,
     responses={
         200: UserDetailSerializer,
         401: OpenApiResponse(description="User is unauthorized"),
         404: OpenApiResponse(description="Found no user with this ID"),
         }
 )
-class UserDetailView(generics.RetrieveUpdateAPIView):
+class UserDetailView(SparseFieldsetViewMixin, generics.RetrieveUpdateAPIView):
     """
     Endpoint for retrieving or partially updating a UserProfile.
 
@@ -134,36 +140,52 @@ class UserDetailView(generics.RetrieveUpdateAPIView):
 @extend_schema(
     tags=['Profile'],
     description="List all business profiles. Authenticated users only.",
+    parameters=SPARSE_FIELDSET_PARAMETERS,
     responses={
         200: UserBusinessListSerializer,
         401: OpenApiResponse(description="User is unauthorized"),
         }
 )
-class BusinessUserListView(generics.ListAPIView):
+class BusinessUserListView(SparseFieldsetViewMixin, generics.ListAPIView):
     """
     Lists all user profiles with type 'business'.
 
-    Accessible only to authenticated users.
+    Accessible only to authenticated users. Profiles can be filtered
+    ('min_rating', 'min_review_count', 'min_completed_orders') and ordered
+    by the ranking counters kept on the profile, so e.g. a top rated page
+    (?ordering=-average_rating&page_size=10) is a single indexed query.
+    Results are paginated, the user and the review stats are joined into
+    the profile query and '?fields=' / '?omit=' limit the returned fields
+    and the loaded columns.
     """
-    queryset = UserProfile.objects.filter(type='business')
+    queryset = UserProfile.objects.filter(type='business').select_related('user__review_stats')
     serializer_class = UserBusinessListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+    filter_backends = [TieBreakingOrderingFilter, DjangoFilterBackend]
+    filterset_class = BusinessProfileFilter
+    ordering_fields = ['average_rating', 'review_count', 'completed_order_count']
+    ordering = ['id']
 
 
 @extend_schema(
     tags=['Profile'],
     description="List all customer profiles. Authenticated users only.",
+    parameters=SPARSE_FIELDSET_PARAMETERS,
     responses={
         200: UserCustomerListSerializer,
         401: OpenApiResponse(description="User is unauthorized"),
         }
 )
-class CustomerUserListView(generics.ListAPIView):
+class CustomerUserListView(SparseFieldsetViewMixin, generics.ListAPIView):
     """
     Lists all user profiles with type 'customer'.
 
-    Accessible only to authenticated users.
+    Accessible only to authenticated users. Results are paginated, the user
+    is joined into the profile query and '?fields=' / '?omit=' limit the
+    returned fields and the loaded columns.
     """
-    queryset = UserProfile.objects.filter(type='customer')
+    queryset = UserProfile.objects.filter(type='customer').select_related('user').order_by('id')
     serializer_class = UserCustomerListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
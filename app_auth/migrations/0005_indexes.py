@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_auth', '0004_alter_userprofile_file'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['type'], name='userprofile_type_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_auth', '0005_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='file_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='File names of the resized image versions by size name'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:26
+
+import core.storage
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_auth', '0006_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='file',
+            field=core.storage.ContentAddressedFileField(blank=True, null=True, upload_to=core.storage.content_addressed_upload),
+        ),
+    ]
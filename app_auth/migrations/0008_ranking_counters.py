@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:34
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_ranking_counters(apps, schema_editor):
+    UserProfile = apps.get_model('app_auth', 'UserProfile')
+    BusinessReviewStats = apps.get_model('app_reviews', 'BusinessReviewStats')
+    Order = apps.get_model('app_orders', 'Order')
+    stats = BusinessReviewStats.objects.filter(business_user_id=OuterRef('user_id'))
+    completed = Order.objects.filter(business_user_id=OuterRef('user_id'), status='completed').order_by().values(
+        'business_user_id').annotate(count=Count('id')).values('count')
+    UserProfile.objects.update(
+        review_count=Coalesce(Subquery(stats.values('review_count')), Value(0)),
+        average_rating=Coalesce(Subquery(stats.values('average_rating')), Value(0.0)),
+        completed_order_count=Coalesce(Subquery(completed), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_auth', '0007_content_addressed_files'),
+        ('app_orders', '0003_indexes'),
+        ('app_reviews', '0003_business_review_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='average_rating',
+            field=models.FloatField(default=0.0, editable=False, help_text="Average rating of the business user's reviews"),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='completed_order_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Number of completed orders of the business user'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='review_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Number of reviews of the business user'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['type', 'average_rating'], name='userprofile_type_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['type', 'review_count'], name='userprofile_type_reviews_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['type', 'completed_order_count'], name='userprofile_type_completed_idx'),
+        ),
+        migrations.RunPython(backfill_ranking_counters, migrations.RunPython.noop),
+    ]
@@ -2,16 +2,28 @@ from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User
 
-from core.utils import overwrite_file_upload
+from core.storage import ContentAddressedFileField, content_addressed_upload
+from core.utils import TrackChangesMixin
 
-class UserProfile(models.Model):
+class UserProfile(TrackChangesMixin, models.Model):
+    """
+    Profile of a customer or business user.
+
+    'review_count', 'average_rating' and 'completed_order_count' are
+    ranking counters of business users, copied from the review stats and
+    the orders by the app_reviews and app_orders signals with UPDATE
+    queries. Regular saves leave them alone, so a profile edit cannot
+    overwrite a concurrent counter update.
+    """
     USER_TYPE_CHOICES = [
         ('customer', 'Customer'),
         ('business', 'Business'),
     ]
+    tracked_fields = ('type', 'file')
 
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
-    file = models.FileField(upload_to=overwrite_file_upload, null=True, blank=True)
+    file = ContentAddressedFileField(upload_to=content_addressed_upload, null=True, blank=True)
+    file_derivatives = models.JSONField(default=dict, blank=True, editable=False, help_text="File names of the resized image versions by size name")
     file_uploaded_at = models.DateTimeField(null=True, blank=True)
     location = models.CharField(max_length=100, null=True, blank=True, default='')
     tel = models.CharField(max_length=20, null=True, blank=True, default='')
@@ -19,13 +31,31 @@ class UserProfile(models.Model):
     working_hours = models.CharField(max_length=100, null=True, blank=True, default='')
     type = models.CharField(choices=USER_TYPE_CHOICES, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    review_count = models.IntegerField(default=0, editable=False, help_text="Number of reviews of the business user")
+    average_rating = models.FloatField(default=0.0, editable=False, help_text="Average rating of the business user's reviews")
+    completed_order_count = models.IntegerField(default=0, editable=False, help_text="Number of completed orders of the business user")
+
+    COUNTER_FIELDS = ('review_count', 'average_rating', 'completed_order_count')
+
+    class Meta:
+        indexes = [
+            # business and customer profile lists, business profile count
+            models.Index(fields=['type'], name='userprofile_type_idx'),
+            # business profile lists filtered and ordered by the ranking counters
+            models.Index(fields=['type', 'average_rating'], name='userprofile_type_rating_idx'),
+            models.Index(fields=['type', 'review_count'], name='userprofile_type_reviews_idx'),
+            models.Index(fields=['type', 'completed_order_count'], name='userprofile_type_completed_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} Profile"
     
     def save(self, *args, **kwargs):
-        if self.pk:
-            old_file = UserProfile.objects.get(pk=self.pk).file
-            if old_file != self.file:
-                self.file_uploaded_at = timezone.now().strftime('%Y-%m-%dT%H:%M:%S')
+        if self.pk and self.has_field_changed('file'):
+            self.file_uploaded_at = timezone.now().strftime('%Y-%m-%dT%H:%M:%S')
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
         super().save(*args, **kwargs)
@@ -0,0 +1,64 @@
+"""
+Resolves the profile type ('business' or 'customer') of the requesting user.
+
+Permission classes ask for the role through get_profile_type(), which reads
+the profile at most once per request: from the user's already loaded
+profile (see CachedTokenAuthentication), else from the shared cache for
+PROFILE_TYPE_CACHE_TIMEOUT seconds, else with one query. Profile signals
+drop the shared entry (see app_auth.signals).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+
+from app_auth.models import UserProfile
+
+NO_PROFILE = ''
+
+
+def profile_type_cache_key(user_id):
+    return f'profile-type:{user_id}'
+
+
+def get_profile_type(request):
+    """
+    Returns the profile type of request.user, or None for anonymous users
+    and users without a profile (or without a type).
+    """
+    if not hasattr(request, '_profile_type'):
+        request._profile_type = load_profile_type(request.user)
+    return request._profile_type
+
+
+def load_profile_type(user):
+    """
+    Returns the profile type of a user, without a query if it is loaded or cached.
+    """
+    if not user or not user.is_authenticated:
+        return None
+    if user._meta.get_field('profile').is_cached(user):
+        try:
+            return user.profile.type
+        except ObjectDoesNotExist:
+            return None
+
+    timeout = getattr(settings, 'PROFILE_TYPE_CACHE_TIMEOUT', 60)
+    key = profile_type_cache_key(user.pk)
+    profile_type = cache.get(key) if timeout else None
+    if profile_type is None:
+        profile_type = UserProfile.objects.filter(user_id=user.pk).values_list('type', flat=True).first()
+        profile_type = profile_type or NO_PROFILE
+        if timeout:
+            cache.set(key, profile_type, timeout)
+    return profile_type or None
+
+
+def invalidate_profile_type(user_id):
+    """
+    Drops the shared cache entry of a user's profile type, now and again
+    once the current transaction commits.
+    """
+    key = profile_type_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
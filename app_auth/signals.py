@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from app_auth.api.authentication import token_cache, invalidate_user_tokens, token_version_name
+from app_auth.models import UserProfile
+from app_auth.roles import invalidate_profile_type
+from core.cache import bump_cache_version
+from core.images import register_image_derivatives
+from core.utils import register_file_cleanup
+
+register_file_cleanup(UserProfile)
+register_image_derivatives(UserProfile, 'file', 'file_derivatives')
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """
+    Stops accepting a deleted token from the token cache of every process.
+    """
+    key, version_name = instance.key, token_version_name(instance.user_id)
+
+    def revoke():
+        token_cache.delete(key)
+        bump_cache_version(version_name)
+
+    revoke()
+    transaction.on_commit(revoke)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_changed_user_tokens(sender, instance, **kwargs):
+    """
+    Drops cached tokens whose user or profile has changed.
+
+    Runs again after commit, so a request authenticating in between cannot
+    put the old state back into the cache.
+    """
+    user_id = instance.pk if sender is User else instance.user_id
+    invalidate_user_tokens(user_id)
+    transaction.on_commit(lambda: invalidate_user_tokens(user_id))
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_cached_profile_type(sender, instance, **kwargs):
+    """
+    Drops the cached profile type of the profile's user.
+    """
+    invalidate_profile_type(instance.user_id)
@@ -3,6 +3,7 @@ URL configuration for meta-related endpoints.
 
 Defines RESTful routes for:
 - Retrieving basic application meta information.
+- Retrieving per-route request metrics (admin only).
 
 Conventions:
 - Uses class-based views for each route.
@@ -10,13 +11,15 @@ Conventions:
 
 Example usage (reverse):
     reverse('base-info')
+    reverse('metrics')
 """
 
 from django.urls import path
 
-from .views import BaseInfoView
+from .views import BaseInfoView, MetricsView
 
 
 urlpatterns = [
-    path('base-info/', BaseInfoView.as_view(), name='base-info')
+    path('base-info/', BaseInfoView.as_view(), name='base-info'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
@@ -1,14 +1,12 @@
-from django.db.models import Avg
-
 from rest_framework import generics
+from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
-from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import AllowAny, IsAdminUser
+from drf_spectacular.utils import extend_schema, OpenApiResponse
 
 from .serializers import BaseInfoSerializer
-from app_reviews.models import Review
-from app_auth.models import UserProfile
-from app_offers.models import Offer
+from app_meta.models import PlatformStats
+from core import metrics
 
 @extend_schema(
     tags=['Meta'],
@@ -21,6 +19,7 @@ class BaseInfoView(generics.RetrieveAPIView):
     
     This view provides meta information such as the total number of reviews,
     average review rating, number of business profiles, and total offers.
+    The numbers come from the incrementally maintained PlatformStats row.
     """
     serializer_class = BaseInfoSerializer
     permission_classes = [AllowAny]
@@ -29,13 +28,29 @@ class BaseInfoView(generics.RetrieveAPIView):
         """
         Handle GET requests to fetch application statistics.
         """
-        average_rating = Review.objects.aggregate(average=Avg('rating'))['average'] or 0.0
+        serializer = self.get_serializer(PlatformStats.get_cached())
+        return Response(serializer.data)
+
+
+@extend_schema(
+    tags=['Meta'],
+    description="Per-route request metrics of the serving process. Admin users only.",
+    responses={
+        200: OpenApiResponse(description="Query count, DB time, serialization time and latency histograms per route."),
+        403: OpenApiResponse(description="User is no admin user"),
+    },
+)
+class MetricsView(APIView):
+    """
+    Returns the request metrics collected by RequestMetricsMiddleware.
+
+    Metrics are aggregated in memory per worker process, keyed by HTTP
+    method and URL name (e.g. 'GET offers-list').
+    """
+    permission_classes = [IsAdminUser]
 
-        data = {
-            "review_count": Review.objects.count(),
-            "average_rating": average_rating,
-            "business_profile_count": UserProfile.objects.filter(type='business').count(),
-            "offer_count": Offer.objects.count(),
-        }
-        serializer = self.get_serializer(data)
-        return Response(serializer.data)
\ No newline at end of file
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests to fetch the aggregated metrics.
+        """
+        return Response(metrics.snapshot())
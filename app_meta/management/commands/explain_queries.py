@@ -0,0 +1,105 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from app_auth.api.views import BusinessUserListView, CustomerUserListView, UserDetailView
+from app_offers.api.views import OfferViewSet, OfferDetailView
+from app_orders.api.views import OrderViewSet
+from app_orders.stats import order_stats_queryset
+from app_reviews.api.views import ReviewViewSet
+
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?!CONSTANT ROW)(\S+)(?! USING)$', re.MULTILINE),
+    'postgresql': re.compile(r'Seq Scan on (\S+)'),
+}
+SORT_PATTERNS = {
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY'),
+    'postgresql': re.compile(r'\bSort\b'),
+}
+
+
+def view_queryset(view_class, params=None, action=None, **kwargs):
+    """
+    Returns the filtered queryset a view would use for a GET request with the given params.
+    """
+    request = Request(APIRequestFactory().get('/', params or {}))
+    view = view_class(request=request, action=action, args=(), kwargs=kwargs, format_kwarg=None)
+    return view.filter_queryset(view.get_queryset())
+
+
+def get_endpoint_queries():
+    """
+    Returns (endpoint, queryset) pairs with the main query of each endpoint.
+    """
+    page = slice(0, 6)
+    return [
+        ('GET /api/offers/', lambda: view_queryset(OfferViewSet, action='list')[page]),
+        ('GET /api/offers/?creator_id=&ordering=-updated_at', lambda: view_queryset(
+            OfferViewSet, {'creator_id': 1, 'ordering': '-updated_at'}, action='list')[page]),
+        ('GET /api/offers/?min_price=&ordering=min_price', lambda: view_queryset(
+            OfferViewSet, {'min_price': 100, 'ordering': 'min_price'}, action='list')[page]),
+        ('GET /api/offers/?max_delivery_time=', lambda: view_queryset(
+            OfferViewSet, {'max_delivery_time': 7}, action='list')[page]),
+        ('GET /api/offers/?search=', lambda: view_queryset(
+            OfferViewSet, {'search': 'design'}, action='list')[page]),
+        ('GET /api/offers/{id}/', lambda: view_queryset(OfferViewSet, action='retrieve').filter(pk=1)),
+        ('GET /api/offerdetails/{id}/', lambda: view_queryset(OfferDetailView).filter(pk=1)),
+        ('GET /api/orders/', lambda: view_queryset(OrderViewSet, action='list')),
+        ('GET /api/order-stats/?business_user_ids=', lambda: order_stats_queryset([1, 2])),
+        ('GET /api/reviews/?business_user_id=&ordering=-updated_at', lambda: view_queryset(
+            ReviewViewSet, {'business_user_id': 1, 'ordering': '-updated_at'}, action='list')),
+        ('GET /api/reviews/?reviewer_id=&ordering=rating', lambda: view_queryset(
+            ReviewViewSet, {'reviewer_id': 1, 'ordering': 'rating'}, action='list')),
+        ('GET /api/reviews/?ordering=-rating', lambda: view_queryset(
+            ReviewViewSet, {'ordering': '-rating'}, action='list')),
+        ('GET /api/profile/{user_id}/', lambda: view_queryset(UserDetailView).filter(user_id=1)),
+        ('GET /api/profiles/business/', lambda: view_queryset(BusinessUserListView)),
+        ('GET /api/profiles/business/?ordering=-average_rating', lambda: view_queryset(
+            BusinessUserListView, {'ordering': '-average_rating'})[page]),
+        ('GET /api/profiles/business/?min_completed_orders=&ordering=-completed_order_count', lambda: view_queryset(
+            BusinessUserListView, {'min_completed_orders': 1, 'ordering': '-completed_order_count'})[page]),
+        ('GET /api/profiles/customer/', lambda: view_queryset(CustomerUserListView)),
+    ]
+
+
+class Command(BaseCommand):
+    """
+    Runs EXPLAIN on the main query of each API endpoint and reports full
+    table scans and sorts that no index covers.
+
+    Usage:
+        python manage.py explain_queries [--verbose] [--fail-on-scan]
+    """
+    help = "Reports API endpoint queries that still do full table scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose', action='store_true', help="Print the full plan of every query.")
+        parser.add_argument('--fail-on-scan', action='store_true', help="Exit with an error if any full scan remains.")
+
+    def handle(self, *args, **options):
+        vendor = connections['default'].vendor
+        scan_pattern = FULL_SCAN_PATTERNS.get(vendor)
+        sort_pattern = SORT_PATTERNS.get(vendor)
+        if scan_pattern is None:
+            raise CommandError(f"Plan analysis is not supported for the '{vendor}' backend.")
+
+        endpoints_with_scans = []
+        for endpoint, build_queryset in get_endpoint_queries():
+            plan = build_queryset().explain()
+            scans = scan_pattern.findall(plan)
+            sorts = sort_pattern.findall(plan)
+            if scans:
+                endpoints_with_scans.append(endpoint)
+                self.stdout.write(self.style.ERROR(f"FULL SCAN  {endpoint}: {', '.join(scans)}"))
+            elif sorts:
+                self.stdout.write(self.style.WARNING(f"SORT       {endpoint}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"OK         {endpoint}"))
+            if options['verbose']:
+                self.stdout.write(plan)
+
+        if endpoints_with_scans and options['fail_on_scan']:
+            raise CommandError(f"{len(endpoints_with_scans)} endpoint queries do full table scans.")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from app_meta.models import PlatformStats
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the platform counters served by /api/base-info/.
+
+    Usage:
+        python manage.py reconcile_platform_stats
+    """
+    help = "Recomputes the platform counters from the reviews, profiles and offers tables."
+
+    def handle(self, *args, **options):
+        before = PlatformStats.objects.filter(pk=PlatformStats.SINGLETON_PK).first()
+        after = PlatformStats.reconcile()
+        for field in ['review_count', 'rating_sum', 'business_profile_count', 'offer_count']:
+            old_value = getattr(before, field) if before else None
+            new_value = getattr(after, field)
+            if old_value != new_value:
+                self.stdout.write(f"{field}: {old_value} -> {new_value}")
+        self.stdout.write(self.style.SUCCESS("Platform stats reconciled."))
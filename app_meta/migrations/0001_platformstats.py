@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('business_profile_count', models.IntegerField(default=0)),
+                ('offer_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'platform stats',
+            },
+        ),
+    ]
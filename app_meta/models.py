@@ -1 +1,86 @@
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import F, Count, Sum
+
+from app_auth.models import UserProfile
+from app_offers.models import Offer
+from app_reviews.models import Review
+
+
+class PlatformStats(models.Model):
+    """
+    Single-row table with the platform counters shown by /api/base-info/.
+
+    The counters are updated incrementally by Review, UserProfile and Offer
+    signals (see app_meta.signals). The average rating is derived from the
+    running 'rating_sum' and 'review_count'. Drift caused by writes that
+    bypass signals is fixed with the 'reconcile_platform_stats' command.
+    """
+    SINGLETON_PK = 1
+    CACHE_KEY = 'platform-stats'
+    CACHE_TIMEOUT = 300
+
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    business_profile_count = models.IntegerField(default=0)
+    offer_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'platform stats'
+
+    def __str__(self):
+        return "Platform stats"
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return 0.0
+        return self.rating_sum / self.review_count
+
+    @classmethod
+    def apply_deltas(cls, **deltas):
+        """
+        Adds the given deltas to the counters in a single UPDATE.
+
+        Creates the row from the source tables if it does not exist yet.
+        """
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        updated = cls.objects.filter(pk=cls.SINGLETON_PK).update(
+            **{name: F(name) + delta for name, delta in deltas.items()})
+        if not updated:
+            cls.reconcile()
+        transaction.on_commit(lambda: cache.delete(cls.CACHE_KEY))
+
+    @classmethod
+    def reconcile(cls):
+        """
+        Recomputes all counters from the source tables and returns the row.
+        """
+        reviews = Review.objects.aggregate(count=Count('id'), rating_sum=Sum('rating'))
+        stats, _ = cls.objects.update_or_create(pk=cls.SINGLETON_PK, defaults={
+            'review_count': reviews['count'],
+            'rating_sum': reviews['rating_sum'] or 0,
+            'business_profile_count': UserProfile.objects.filter(type='business').count(),
+            'offer_count': Offer.objects.count(),
+        })
+        transaction.on_commit(lambda: cache.delete(cls.CACHE_KEY))
+        return stats
+
+    @classmethod
+    def get_cached(cls):
+        """
+        Returns the counters as a dict, from the cache if possible.
+        """
+        data = cache.get(cls.CACHE_KEY)
+        if data is None:
+            stats = cls.objects.filter(pk=cls.SINGLETON_PK).first() or cls.reconcile()
+            data = {
+                'review_count': stats.review_count,
+                'average_rating': stats.average_rating,
+                'business_profile_count': stats.business_profile_count,
+                'offer_count': stats.offer_count,
+            }
+            cache.set(cls.CACHE_KEY, data, cls.CACHE_TIMEOUT)
+        return data
@@ -0,0 +1,58 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from app_auth.models import UserProfile
+from app_meta.models import PlatformStats
+from app_offers.models import Offer
+from app_offers.signals import offers_bulk_created
+from app_reviews.models import Review
+
+
+@receiver(post_save, sender=Review)
+def count_saved_review(sender, instance, created, **kwargs):
+    """
+    Counts a new review, or moves the rating sum by the change of an edited rating.
+    """
+    if created:
+        PlatformStats.apply_deltas(review_count=1, rating_sum=instance.rating)
+    else:
+        old_rating = instance.get_loaded_value('rating', instance.rating)
+        PlatformStats.apply_deltas(rating_sum=instance.rating - old_rating)
+
+
+@receiver(post_delete, sender=Review)
+def count_deleted_review(sender, instance, **kwargs):
+    old_rating = instance.get_loaded_value('rating', instance.rating)
+    PlatformStats.apply_deltas(review_count=-1, rating_sum=-old_rating)
+
+
+@receiver(post_save, sender=UserProfile)
+def count_saved_profile(sender, instance, created, **kwargs):
+    """
+    Counts business profiles, including profiles whose type changed.
+    """
+    was_business = not created and instance.get_loaded_value('type', instance.type) == 'business'
+    is_business = instance.type == 'business'
+    PlatformStats.apply_deltas(business_profile_count=int(is_business) - int(was_business))
+
+
+@receiver(post_delete, sender=UserProfile)
+def count_deleted_profile(sender, instance, **kwargs):
+    if instance.get_loaded_value('type', instance.type) == 'business':
+        PlatformStats.apply_deltas(business_profile_count=-1)
+
+
+@receiver(post_save, sender=Offer)
+def count_saved_offer(sender, instance, created, **kwargs):
+    if created:
+        PlatformStats.apply_deltas(offer_count=1)
+
+
+@receiver(offers_bulk_created, sender=Offer)
+def count_bulk_created_offers(sender, offers, **kwargs):
+    PlatformStats.apply_deltas(offer_count=len(offers))
+
+
+@receiver(post_delete, sender=Offer)
+def count_deleted_offer(sender, instance, **kwargs):
+    PlatformStats.apply_deltas(offer_count=-1)
@@ -1,3 +1,116 @@
-from django.test import TestCase
+import re
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from app_auth.models import UserProfile
+from app_meta.models import PlatformStats
+from app_offers.api.caching import object_cache
+from app_offers.api.serializers import OfferDetailDetailsSerializer
+from app_offers.models import Offer, OfferDetail
+from app_reviews.models import Review
+from core import metrics
+from core.serializers import ValuesSerializer
+
+
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        metrics.reset()
+        cache.clear()
+        object_cache.clear()
+
+    def test_server_timing_header_and_metrics_endpoint(self):
+        response = self.client.get(reverse('offers-list'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+, render;dur=[\d.]+, total;dur=[\d.]+$')
+
+        admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_authenticate(admin)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        offers_list = response.data['GET offers-list']
+        self.assertEqual(offers_list['requests'], 1)
+        self.assertGreater(offers_list['queries']['sum'], 0)
+
+    def assertSerializationTimed(self, response, route):
+        serialize_ms = float(re.search(r'serialize;dur=([\d.]+)', response['Server-Timing']).group(1))
+        self.assertGreaterEqual(serialize_ms, 20)
+        self.assertGreaterEqual(metrics.snapshot()[route]['serialize_ms']['sum'], 20)
+
+    def test_serializer_time_is_reported(self):
+        user = User.objects.create(username='business')
+        offer = Offer.objects.create(user=user, title='Logo design', description='Logo')
+        detail = OfferDetail.objects.create(offer=offer, title='Basic', price=100, offer_type='basic')
+        self.client.force_authenticate(user)
+        to_representation = OfferDetailDetailsSerializer.to_representation
+
+        def slow_to_representation(serializer, instance):
+            time.sleep(0.02)
+            return to_representation(serializer, instance)
+
+        with mock.patch.object(OfferDetailDetailsSerializer, 'to_representation', slow_to_representation):
+            response = self.client.get(reverse('offer-detail', args=[detail.pk]))
+        self.assertSerializationTimed(response, 'GET offer-detail')
+
+    def test_fast_list_serialization_time_is_reported(self):
+        user = User.objects.create(username='business')
+        Offer.objects.create(user=user, title='Logo design', description='Logo')
+        to_representation = ValuesSerializer.to_representation
+
+        def slow_to_representation(values_serializer, row):
+            time.sleep(0.02)
+            return to_representation(values_serializer, row)
+
+        with mock.patch.object(ValuesSerializer, 'to_representation', slow_to_representation):
+            response = self.client.get(reverse('offers-list'))
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertSerializationTimed(response, 'GET offers-list')
+
+    def test_metrics_endpoint_requires_admin(self):
+        user = User.objects.create(username='user')
+        self.client.force_authenticate(user)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class PlatformStatsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.business = User.objects.create(username='business')
+        self.profile = UserProfile.objects.create(user=self.business, type='business')
+        self.customers = [User.objects.create(username=f'customer{i}') for i in range(2)]
+
+    def get_base_info(self):
+        cache.clear()
+        with self.assertNumQueries(1):
+            return self.client.get(reverse('base-info')).data
+
+    def test_counters_follow_writes(self):
+        offer = Offer.objects.create(user=self.business, title='Offer', description='Offer')
+        first = Review.objects.create(business_user=self.business, reviewer=self.customers[0], rating=5)
+        Review.objects.create(business_user=self.business, reviewer=self.customers[1], rating=2)
+        self.assertEqual(self.get_base_info(), {
+            'review_count': 2, 'average_rating': 3.5, 'business_profile_count': 1, 'offer_count': 1})
+
+        first = Review.objects.get(pk=first.pk)
+        first.rating = 4
+        first.save()
+        self.profile.type = 'customer'
+        self.profile.save()
+        offer.delete()
+        self.assertEqual(self.get_base_info(), {
+            'review_count': 2, 'average_rating': 3.0, 'business_profile_count': 0, 'offer_count': 0})
+
+        Review.objects.get(pk=first.pk).delete()
+        self.assertEqual(self.get_base_info()['review_count'], 1)
+
+    def test_reconcile_fixes_drift(self):
+        Offer.objects.create(user=self.business, title='Offer', description='Offer')
+        PlatformStats.objects.update(offer_count=42, review_count=7)
+        PlatformStats.reconcile()
+        self.assertEqual(self.get_base_info()['offer_count'], 1)
+        self.assertEqual(self.get_base_info()['review_count'], 0)
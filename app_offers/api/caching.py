@@ -0,0 +1,157 @@
+import hashlib
+import math
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.permissions import BasePermission
+from rest_framework.response import Response
+
+from core.cache import get_cache_version, TieredCache
+
+OFFER_LIST_VERSION = 'offer-list'
+
+object_cache = TieredCache(
+    maxsize=settings.OBJECT_CACHE_SIZE, timeout=settings.OBJECT_CACHE_TIMEOUT, shared_alias=settings.OBJECT_CACHE_ALIAS)
+
+
+def offer_version_name(offer_id):
+    """
+    Returns the version name of cached payloads that show the given offer.
+    """
+    return f'offer:{offer_id}'
+
+
+class CachedListResponseMixin:
+    """
+    ViewSet mixin that caches list responses and answers conditional GETs.
+
+    Responses are cached per normalized query string (plus host and
+    response format) under a version stamp that is bumped whenever data
+    shown in the list changes (see 'list_cache_version'). The stamp comes
+    from the cache shared by all workers (core.cache), so a write in any of
+    them changes it. It also yields the ETag and the Last-Modified header
+    (rounded up to the next second), so requests with a matching
+    If-None-Match or If-Modified-Since get a 304 without a database query.
+    LIST_RESPONSE_CACHE_TIMEOUT sets the cache lifetime in seconds, 0 turns
+    caching and conditional responses off.
+    """
+    list_cache_version = None
+
+    def list(self, request, *args, **kwargs):
+        timeout = getattr(settings, 'LIST_RESPONSE_CACHE_TIMEOUT', 60)
+        if not timeout:
+            return super().list(request, *args, **kwargs)
+
+        version = get_cache_version(self.list_cache_version)
+        digest = self.get_list_cache_digest(request, version)
+        etag, last_modified = f'"{digest}"', math.ceil(version)
+
+        if self.is_not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            key = f'list:{self.list_cache_version}:{digest}'
+            data = cache.get(key)
+            if data is None:
+                response = super().list(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(key, response.data, timeout)
+            else:
+                response = Response(data)
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def get_list_cache_digest(self, request, version):
+        """
+        Returns a digest of the version stamp and the normalized request.
+
+        Parameters are sorted and whitespace-normalized, and search terms
+        lowercased, so equivalent query strings share one cache entry.
+        """
+        params = []
+        for name, values in sorted(request.query_params.lists()):
+            for value in sorted(values):
+                value = ' '.join(value.split())
+                if name == 'search':
+                    value = value.lower()
+                params.append((name, value))
+        renderer_format = getattr(request, 'accepted_renderer', None) and request.accepted_renderer.format
+        identity = f'{version}|{request.get_host()}|{renderer_format}|{urlencode(params)}'
+        return hashlib.md5(identity.encode()).hexdigest()
+
+    def is_not_modified(self, request, etag, last_modified):
+        """
+        Returns True if the client's cached copy is current.
+
+        If-None-Match takes precedence over If-Modified-Since, as in RFC 9110.
+        """
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        return if_modified_since is not None and last_modified <= if_modified_since
+
+
+class CachedRetrieveMixin:
+    """
+    View mixin that serves retrieve requests from a read-through cache.
+
+    Serialized payloads are kept in 'object_cache' (an in-process LRU plus
+    the optional OBJECT_CACHE_ALIAS cache) together with the version stamp
+    of the offer they show, taken from 'retrieve_cache_offer_attr' of the
+    object. A cached payload is used while that version is unchanged; offer
+    and offer detail writes bump it. The stamp comes from the cache shared by
+    all workers (core.cache), so a write handled by another worker takes
+    effect at once and a repeat read runs no query.
+
+    A hit never loads the object, so object permissions cannot be checked on
+    it: views whose permissions implement 'has_object_permission' always
+    read through get_object() and bypass the cache.
+    """
+    retrieve_cache_offer_attr = 'pk'
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.has_object_permissions():
+            return super().retrieve(request, *args, **kwargs)
+
+        key = self.get_retrieve_cache_key(request)
+        entry = object_cache.get(key)
+        if entry is not None:
+            offer_id, version, data = entry
+            if get_cache_version(offer_version_name(offer_id)) == version:
+                return Response(data)
+
+        instance = self.get_object()
+        offer_id = getattr(instance, self.retrieve_cache_offer_attr)
+        version = get_cache_version(offer_version_name(offer_id))
+        data = self.get_serializer(instance).data
+        object_cache.set(key, (offer_id, version, data))
+        return Response(data)
+
+    def has_object_permissions(self):
+        """
+        Returns True if any permission of the view checks single objects.
+        """
+        return any(
+            getattr(type(permission), 'has_object_permission', None) is not BasePermission.has_object_permission
+            for permission in self.get_permissions()
+        )
+
+    def get_retrieve_cache_key(self, request):
+        """
+        Builds the key from the view, lookup value, host, response format
+        and the query parameters (e.g. sparse fieldsets).
+        """
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        renderer_format = getattr(request, 'accepted_renderer', None) and request.accepted_renderer.format
+        params = hashlib.md5(urlencode(sorted(request.query_params.lists()), doseq=True).encode()).hexdigest()
+        return f'retrieve:{type(self).__name__}:{lookup}:{request.get_host()}:{renderer_format}:{params}'
@@ -1,9 +1,15 @@
+from django.db.models.expressions import RawSQL
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
 from app_offers.models import Offer
+from app_offers.search import FTS_TABLE, OFFER_TABLE, search_index_available, build_match_query
 
 class OfferFilter(filters.FilterSet):
     """
     FilterSet for filtering offers based on minimum price and maximum delivery time.
+    Both filters work on the indexed min_price and min_delivery_time columns of Offer.
     """
     creator_id = filters.NumberFilter(field_name='user_id', lookup_expr='exact')
     min_price = filters.NumberFilter(field_name='min_price', lookup_expr='gte')
@@ -11,4 +17,33 @@ class OfferFilter(filters.FilterSet):
 
     class Meta:
         model = Offer
-        fields = ['creator_id', 'min_price', 'max_delivery_time']
\ No newline at end of file
+        fields = ['creator_id', 'min_price', 'max_delivery_time']
+
+
+class OfferSearchFilter(SearchFilter):
+    """
+    Search filter for offers backed by the FTS5 index of title and description.
+
+    Each search term is matched as a word prefix and all terms must match.
+    Unless the client asks for an explicit ordering, results are ranked by
+    relevance (BM25, title matches weighted higher than description matches).
+    Falls back to DRF's LIKE based search where the index is not available.
+    """
+    title_weight = 10.0
+    description_weight = 1.0
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        match = build_match_query(search_terms)
+        if match is None or not search_index_available(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        queryset = queryset.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]))
+        queryset = queryset.annotate(search_rank=RawSQL(
+            f"SELECT bm25({FTS_TABLE}, %s, %s) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = {OFFER_TABLE}.id",
+            [self.title_weight, self.description_weight, match]))
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('search_rank', '-updated_at')
+        return queryset
@@ -1,11 +1,286 @@
-from rest_framework.pagination import PageNumberPagination
+import functools
+import hashlib
+import json
+from datetime import datetime
+from urllib.parse import urlencode
 
-class StandardResultsSetPagination(PageNumberPagination):
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator as DjangoPaginator, EmptyPage
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+from core.cache import get_cache_version, count_version_name
+from core.pagination import StandardResultsSetPagination
+
+
+class KnownCountPaginator(DjangoPaginator):
+    """
+    Django paginator that uses a count computed by the pagination class.
+
+    If the count is only an estimate, pages are not validated against it.
+    Each page fetches one extra row instead, which tells whether a following
+    page exists and yields the exact count once the last page is reached.
+    """
+    def __init__(self, object_list, per_page, count, count_is_exact=True, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
+        self.count_is_exact = count_is_exact
+
+    def validate_number(self, number):
+        if self.count_is_exact:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return super().validate_number(number)
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        if self.count_is_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        items = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not items and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        if len(items) > self.per_page:
+            self.count = max(self.count, bottom + len(items))
+        else:
+            self.count, self.count_is_exact = bottom + len(items), True
+        return self._get_page(items[:self.per_page], number, self)
+
+
+class CachedCountPagination(StandardResultsSetPagination):
+    """
+    Page number pagination that caches the total count of a listing.
+
+    Counts are cached per normalized filter/search query for a short time
+    and dropped as soon as rows of the model are created or deleted.
+    Counting stops after 'exact_count_limit' rows; larger results get an
+    estimated count instead, which the response flags with 'count_is_exact'.
+    """
+    count_cache_timeout = 30
+    exact_count_limit = 10000
+    count_ignored_params = ['page', 'page_size', 'ordering', 'cursor', 'format']
+
+    def paginate_queryset(self, queryset, request, view=None):
+        count, count_is_exact = self.get_count(queryset, request)
+        self.django_paginator_class = functools.partial(
+            KnownCountPaginator, count=count, count_is_exact=count_is_exact)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset, request):
+        """
+        Returns a (count, count_is_exact) tuple, from the cache if possible.
+        """
+        key = self.get_count_cache_key(queryset, request)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        bounded_count = queryset.order_by()[:self.exact_count_limit + 1].count()
+        if bounded_count <= self.exact_count_limit:
+            result = (bounded_count, True)
+        else:
+            result = (max(self.estimate_count(queryset), bounded_count), False)
+        cache.set(key, result, self.count_cache_timeout)
+        return result
+
+    def estimate_count(self, queryset):
+        """
+        Returns the planner's row estimate on PostgreSQL.
+
+        Other backends have no cheap estimate, so the caller falls back to
+        the bounded count, which is a lower bound.
+        """
+        if connections[queryset.db].vendor != 'postgresql':
+            return 0
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def get_count_cache_key(self, queryset, request):
+        """
+        Builds the cache key from the filter and search parameters.
+
+        Parameters that do not change the count are ignored, and values are
+        stripped (search terms also lowercased) so equivalent queries share
+        one entry.
+        """
+        params = []
+        for name, values in sorted(request.query_params.lists()):
+            if name in self.count_ignored_params:
+                continue
+            for value in sorted(values):
+                value = ' '.join(value.split())
+                if name == 'search':
+                    value = value.lower()
+                params.append((name, value))
+        digest = hashlib.md5(urlencode(params).encode()).hexdigest()
+        version = get_cache_version(count_version_name(queryset.model))
+        return f'count:{queryset.model._meta.label_lower}:{version}:{digest}'
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data = {
+            'count': response.data['count'],
+            'count_is_exact': self.page.paginator.count_is_exact,
+            'next': response.data['next'],
+            'previous': response.data['previous'],
+            'results': response.data['results'],
+        }
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_exact'] = {
+            'type': 'boolean',
+            'example': True,
+            'description': 'False if the count is an estimate.',
+        }
+        return response_schema
+
+
+class OfferCursorPagination(CursorPagination):
     """
-    Standard pagination class for API results.
+    Keyset pagination for offers, used when the client sends a 'cursor' parameter.
 
-    Defines default page size and maximum page size for paginated responses.
+    Pages are addressed by the (ordering value, id) pair of their boundary row
+    instead of an offset, so every page is a single index range scan and no
+    COUNT(*) is needed, however deep the client scrolls.
+    Supports the same 'ordering' values as the view ('updated_at', 'min_price',
+    optionally prefixed with '-'); defaults to newest first.
     """
-    page_size = 6
-    max_page_size = 100
-    page_size_query_param = 'page_size'
\ No newline at end of file
+    page_size = StandardResultsSetPagination.page_size
+    max_page_size = StandardResultsSetPagination.max_page_size
+    page_size_query_param = 'page_size'
+    ordering = '-updated_at'
+    ordering_param = 'ordering'
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Returns the (field, id) ordering requested through the 'ordering' parameter.
+
+        Falls back to the default ordering if the parameter is missing or
+        names a field that is not in the view's 'ordering_fields'.
+        """
+        allowed = getattr(view, 'ordering_fields', None) or [self.ordering.lstrip('-')]
+        ordering = self.ordering
+        for term in request.query_params.get(self.ordering_param, '').split(','):
+            term = term.strip()
+            if term and term.lstrip('-') in allowed:
+                ordering = term
+                break
+        tiebreaker = '-id' if ordering.startswith('-') else 'id'
+        return (ordering, tiebreaker)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = self.cursor.reverse, self.cursor.position
+
+        # A reverse cursor walks the same sequence backwards: the direction
+        # flips and NULLs (offers without details) move to the front.
+        field = self.ordering[0].lstrip('-')
+        descending = self.ordering[0].startswith('-') != reverse
+        nulls_last = not reverse
+        queryset = queryset.order_by(*self._get_order_by(field, descending, nulls_last))
+
+        if current_position is not None:
+            value, pk = self._decode_position(current_position, queryset.model, field)
+            queryset = queryset.filter(self._get_seek_filter(queryset.model, field, value, pk, descending, nulls_last))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _get_order_by(self, field, descending, nulls_last):
+        """
+        Returns the order_by expressions for the field and the id tiebreaker.
+        """
+        nulls = {'nulls_last': True} if nulls_last else {'nulls_first': True}
+        if descending:
+            return [F(field).desc(**nulls), F('id').desc()]
+        return [F(field).asc(**nulls), F('id').asc()]
+
+    def _get_seek_filter(self, model, field, value, pk, descending, nulls_last):
+        """
+        Returns a filter matching the rows strictly after (value, pk) in the
+        given ordering.
+        """
+        after = 'lt' if descending else 'gt'
+        nullable = model._meta.get_field(field).null
+        if value is None:
+            in_null_block = Q(**{f'{field}__isnull': True, f'id__{after}': pk})
+            if nulls_last:
+                return in_null_block
+            return in_null_block | Q(**{f'{field}__isnull': False})
+
+        seek = Q(**{f'{field}__{after}': value}) | Q(**{field: value, f'id__{after}': pk})
+        if nullable and nulls_last:
+            seek |= Q(**{f'{field}__isnull': True})
+        return seek
+
+    def _get_position_from_instance(self, instance, ordering):
+        """
+        Encodes the (ordering value, id) pair of a row as the cursor position.
+        """
+        field_name = ordering[0].lstrip('-')
+        if isinstance(instance, dict):
+            value, pk = instance[field_name], instance['id']
+        else:
+            value, pk = getattr(instance, field_name), instance.pk
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        return json.dumps([value, pk])
+
+    def _decode_position(self, position, model, field):
+        """
+        Decodes a cursor position back into its (ordering value, id) pair.
+        """
+        try:
+            value, pk = json.loads(position)
+            value = model._meta.get_field(field).to_python(value)
+            return value, int(pk)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
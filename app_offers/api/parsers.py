@@ -0,0 +1,14 @@
+from rest_framework.parsers import BaseParser
+
+
+class JSONLinesParser(BaseParser):
+    """
+    Parser for JSON Lines (NDJSON) request bodies.
+
+    Returns an iterator over the raw lines instead of parsed data, so the
+    view reads the body line by line while it processes it.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return iter(stream.readline, b'')
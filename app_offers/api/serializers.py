@@ -1,7 +1,13 @@
+from collections import defaultdict
+
+from django.db import transaction
 from rest_framework import serializers
+from rest_framework.relations import PKOnlyObject
 from drf_spectacular.utils import extend_schema_field
 
 from app_offers.models import Offer, OfferDetail
+from core.images import DerivativeURLsField
+from core.serializers import SparseFieldsetMixin
 
 class OfferDetailDetailsSerializer(serializers.ModelSerializer):
     """
@@ -34,20 +40,26 @@ class OfferDetailURLSerializer(serializers.ModelSerializer):
         fields = ['id', 'url']
 
 
-class OffersSerializer(serializers.ModelSerializer):
+class OffersSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for Offer model in list and retrieve views.
     Includes nested details as URLs, user info, and calculated fields.
+    Supports '?fields=' and '?omit='.
     """
+    sparse_field_sources = {
+        'details': [],
+        'user_details': ['user__first_name', 'user__last_name', 'user__username'],
+    }
     details = OfferDetailURLSerializer(many=True, read_only=True)
     user_details = serializers.SerializerMethodField()
     min_price = serializers.DecimalField(max_digits=10, decimal_places=2, coerce_to_string=False, read_only=True, help_text="Minimum price among all offer details." )
     min_delivery_time = serializers.IntegerField(read_only=True, help_text="Minimum delivery time in days among all offer details." )
+    image_derivatives = DerivativeURLsField(storage_field='image', help_text="URLs of the resized image versions by size name.")
 
     class Meta:
         model = Offer
         fields = [
-            'id', 'user', 'title', 'image', 'description', 'created_at', 'updated_at',
+            'id', 'user', 'title', 'image', 'image_derivatives', 'description', 'created_at', 'updated_at',
             'details', 'min_price', 'min_delivery_time', 'user_details'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'user', 'min_price', 'min_delivery_time', 'user_details']
@@ -71,6 +83,33 @@ class OffersSerializer(serializers.ModelSerializer):
             'username': user.username
         }
 
+    def prepare_values(self, rows):
+        """
+        Loads the detail ids of a page of offer rows in one query (see core.serializers.ValuesSerializer).
+        """
+        self._detail_ids = defaultdict(list)
+        if 'details' in self.fields:
+            details = OfferDetail.objects.filter(offer_id__in=[row['id'] for row in rows])
+            for offer_id, detail_id in details.values_list('offer_id', 'id'):
+                self._detail_ids[offer_id].append(detail_id)
+
+    def get_details_from_values(self, row):
+        if not hasattr(self, '_detail_url_parts'):
+            # the URL of a placeholder id, split around it, so rows need no reverse()
+            url_field = self.fields['details'].child.fields['url']
+            placeholder = 987654321
+            url = url_field.get_url(PKOnlyObject(placeholder), url_field.view_name, self.context.get('request'), None)
+            self._detail_url_parts = url.rsplit(str(placeholder), 1)
+        prefix, suffix = self._detail_url_parts
+        return [{'id': pk, 'url': f'{prefix}{pk}{suffix}'} for pk in self._detail_ids[row['id']]]
+
+    def get_user_details_from_values(self, row):
+        return {
+            'first_name': row['user__first_name'],
+            'last_name': row['user__last_name'],
+            'username': row['user__username']
+        }
+
 
 class OfferDetailSerializer(OffersSerializer):
     """
@@ -79,7 +118,7 @@ class OfferDetailSerializer(OffersSerializer):
     class Meta:
         model = Offer
         fields = [
-            'id', 'user', 'title', 'image', 'description', 'created_at', 'updated_at',
+            'id', 'user', 'title', 'image', 'image_derivatives', 'description', 'created_at', 'updated_at',
             'details', 'min_price', 'min_delivery_time'
         ]
 
@@ -98,9 +137,9 @@ class OfferCreateUpdateSerializer(serializers.ModelSerializer):
 
     def validate_details(self, value):
         """
-        Validates that at least three offer details are provided on POST.
+        Validates that at least three offer details are provided on create.
         """
-        if self.context['request'].method == 'POST':
+        if self.instance is None:
             if len(value) < 3:
                 raise serializers.ValidationError("At least three offer details are required.")
         return value
@@ -108,40 +147,91 @@ class OfferCreateUpdateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """
         Creates an Offer and its related OfferDetail objects.
+
+        Runs in one transaction with a fixed number of statements: the
+        details are inserted with a single bulk insert, and the offer's
+        min_price/min_delivery_time are computed up front.
         """
-        details_data = validated_data.pop('details', [])
         validated_data.pop('user', None)
-        user = self.context['request'].user
-        offer = Offer.objects.create(user=user, **validated_data)
-        for detail_data in details_data:
-            OfferDetail.objects.create(offer=offer, **detail_data)
+        offer, details = self.build_offer(validated_data, self.context['request'].user)
+        with transaction.atomic():
+            offer.save(force_insert=True)
+            for detail in details:
+                detail.offer = offer
+            OfferDetail.objects.bulk_create(details)
         return offer
 
+    @staticmethod
+    def build_offer(validated_data, user):
+        """
+        Returns an unsaved Offer and its unsaved OfferDetail objects for the
+        given validated data, with min_price/min_delivery_time already set.
+        """
+        validated_data = dict(validated_data)
+        details = [OfferDetail(**detail_data) for detail_data in validated_data.pop('details', [])]
+        offer = Offer(
+            user=user,
+            min_price=min((detail.price for detail in details), default=None),
+            min_delivery_time=min((detail.delivery_time_in_days for detail in details), default=None),
+            **validated_data,
+        )
+        return offer, details
+
     def update(self, instance, validated_data):
         """
         Updates Offer fields and nested OfferDetail objects by offer_type.
         Only the details provided in the request are updated.
+
+        Runs in one transaction with a fixed number of statements: the
+        existing details are loaded with one query and written back with
+        a single bulk update.
         """
         details_data = validated_data.pop('details', None)
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-
-        if details_data is not None:
-            for detail_data in details_data:
-                offer_type = detail_data.get('offer_type')
-                if not offer_type:
-                    raise serializers.ValidationError("Each detail must have an 'offer_type' field.")
-                try:
-                    detail_instance = instance.details.get(offer_type=offer_type)
-                except OfferDetail.DoesNotExist:
-                    raise serializers.ValidationError(f"OfferDetail with offer_type '{offer_type}' does not exist.")
-                
-                for field, value in detail_data.items():
-                    if field != 'offer_type':
-                        setattr(detail_instance, field, value)
-                detail_instance.save()
+        changed_details = self.apply_details_data(instance, details_data) if details_data is not None else {}
+
+        with transaction.atomic():
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+
+            if changed_details:
+                changed_fields = sorted({field for fields in changed_details.values() for field in fields})
+                OfferDetail.objects.bulk_update(list(changed_details), changed_fields)
+                Offer.objects.filter(pk=instance.pk).refresh_min_values()
         return instance
 
+    def apply_details_data(self, instance, details_data):
+        """
+        Applies the given detail data to the offer's existing details in memory.
 
+        Returns a dict mapping each changed OfferDetail to the names of its
+        changed fields. Raises a ValidationError before anything is written
+        if a detail has no or an unknown offer_type.
+        """
+        details = {detail.offer_type: detail for detail in instance.details.all()}
+        changed_details = {}
+        for detail_data in details_data:
+            offer_type = detail_data.get('offer_type')
+            if not offer_type:
+                raise serializers.ValidationError("Each detail must have an 'offer_type' field.")
+            detail_instance = details.get(offer_type)
+            if detail_instance is None:
+                raise serializers.ValidationError(f"OfferDetail with offer_type '{offer_type}' does not exist.")
+
+            fields = changed_details.setdefault(detail_instance, set())
+            for field, value in detail_data.items():
+                if field != 'offer_type':
+                    setattr(detail_instance, field, value)
+                    fields.add(field)
+        return {detail: fields for detail, fields in changed_details.items() if fields}
+
+
+class OfferBulkSerializer(OfferCreateUpdateSerializer):
+    """
+    Serializer for one offer of a bulk import or export line.
 
+    Same rules as OfferCreateUpdateSerializer, without the image upload,
+    so exported lines can be imported again as they are.
+    """
+    class Meta(OfferCreateUpdateSerializer.Meta):
+        fields = ['id', 'title', 'description', 'details']
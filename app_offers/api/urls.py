@@ -4,6 +4,7 @@ URL configuration for offer-related endpoints.
 Defines RESTful routes for:
 - Listing, creating, updating, and deleting offers.
 - Retrieving detailed information for a specific offer.
+- Bulk importing and exporting offers as JSON Lines.
 
 Conventions:
 - Uses a router for viewsets and a class-based view for detailed retrieval.
@@ -11,6 +12,8 @@ Conventions:
 
 Example usage (reverse):
     reverse('offers-list')
+    reverse('offers-bulk-import')
+    reverse('offers-bulk-export')
     reverse('offer-detail', args=[1])
 """
 
@@ -1,54 +1,92 @@
-from django.db.models import Min
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, generics, filters
+from rest_framework.decorators import action
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from drf_spectacular.utils import extend_schema, OpenApiResponse
+from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParameter
 
-from .serializers import OffersSerializer, OfferDetailDetailsSerializer, OfferCreateUpdateSerializer, OfferDetailSerializer
+from .serializers import OffersSerializer, OfferDetailDetailsSerializer, OfferCreateUpdateSerializer, OfferDetailSerializer, OfferBulkSerializer
+from app_offers.bulk import import_offers, export_offers, to_json_lines
 from app_offers.models import Offer, OfferDetail
+from .parsers import JSONLinesParser
 from .permissions import IsBusinessUser, IsOwnerOfOffer
-from .filters import OfferFilter
-from .pagination import StandardResultsSetPagination
+from .filters import OfferFilter, OfferSearchFilter
+from .pagination import CachedCountPagination, OfferCursorPagination
+from .caching import CachedListResponseMixin, CachedRetrieveMixin, OFFER_LIST_VERSION
+from core.serializers import SPARSE_FIELDSET_PARAMETERS
+from core.views import SparseFieldsetViewMixin, FastListMixin
 
 
 @extend_schema(
     tags=['Offers'],
     description="API endpoint for managing offers.",
 )
-class OfferViewSet(viewsets.ModelViewSet):
+class OfferViewSet(CachedListResponseMixin, CachedRetrieveMixin, SparseFieldsetViewMixin, FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing offers.
 
+    List responses are cached and support conditional GETs (ETag,
+    Last-Modified) until an offer, offer detail or offer owner changes;
+    single offers are cached until the offer or one of its details changes.
+    Reads support '?fields=' and '?omit=', which also limit the loaded columns.
+    Lists are serialized from .values() rows (see core.views.FastListMixin).
+
     Actions:
         list: List all offers.
         create: Create a new offer.
         retrieve: Retrieve a specific offer by ID.
         partial_update: Partially update an existing offer.
         destroy: Delete an existing offer.
+        bulk_import: Create many offers from a JSON Lines body.
+        bulk_export: Stream all (filtered) offers as JSON Lines.
     """
     permission_classes = [AllowAny]
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, OfferSearchFilter]
     filterset_class = OfferFilter
     search_fields = ['title', 'description']
     ordering_fields = ['updated_at', 'min_price']
-    pagination_class = StandardResultsSetPagination
+    # cursor pagination reads the ordering value of the boundary rows
+    sparse_required_fields = ordering_fields
+    pagination_class = CachedCountPagination
+    cursor_pagination_class = OfferCursorPagination
+    list_cache_version = OFFER_LIST_VERSION
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def get_queryset(self):
         """
-        Returns offers annotated with minimum price and minimum delivery time.
+        Returns all offers.
+
+        'min_price' and 'min_delivery_time' are stored on the offer and kept
+        in sync with its details, so filtering and ordering on them can use
+        their indexes instead of aggregating over 'details' per request.
+        For reads, the owner is joined and the detail ids are prefetched, so
+        a page costs the same number of queries whatever its size.
+        """
+        queryset = Offer.objects.all()
+        if self.action in ['list', 'retrieve']:
+            queryset = queryset.select_related('user').prefetch_related(
+                Prefetch('details', queryset=OfferDetail.objects.only('id', 'offer_id')))
+        return queryset
 
-        Uses aggregation to add 'min_price' and 'min_delivery_time' fields
-        based on related 'details' entries.
+    @property
+    def paginator(self):
         """
-        return Offer.objects.annotate(
-            min_price=Min('details__price'),
-            min_delivery_time=Min('details__delivery_time_in_days')
-        )
+        Returns the paginator instance for this request.
+
+        Clients opt into keyset pagination by sending a 'cursor' parameter
+        (an empty value starts at the first page); page number pagination
+        stays the default.
+        """
+        request = getattr(self, 'request', None)
+        query_params = getattr(request, 'query_params', {})
+        if not hasattr(self, '_paginator') and self.cursor_pagination_class.cursor_query_param in query_params:
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
 
     def get_permissions(self):
         """
@@ -58,7 +96,7 @@ class OfferViewSet(viewsets.ModelViewSet):
         permission_classes = [IsAuthenticated]
         if self.action == 'list':
             permission_classes = [AllowAny]
-        if self.action == 'create':
+        if self.action in ['create', 'bulk_import']:
             permission_classes.append(IsBusinessUser)
         if self.action in ['partial_update', 'destroy']:
             permission_classes.append(IsOwnerOfOffer)
@@ -76,11 +114,20 @@ class OfferViewSet(viewsets.ModelViewSet):
             return OfferDetailSerializer
         if self.action in ['create', 'partial_update']:
             return OfferCreateUpdateSerializer
+        if self.action in ['bulk_import', 'bulk_export']:
+            return OfferBulkSerializer
         return OffersSerializer
 
     @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'cursor', str, required=False,
+                description="Opt into cursor pagination. Send an empty value for the first page, then follow the 'next' link."),
+            *SPARSE_FIELDSET_PARAMETERS,
+        ],
         responses={
             200: OffersSerializer,
+            304: OpenApiResponse(description="Not modified since the ETag or date sent by the client"),
             400: OpenApiResponse(description="Bad Request"),
         }
     )
@@ -105,6 +152,7 @@ class OfferViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
     @extend_schema(
+        parameters=SPARSE_FIELDSET_PARAMETERS,
         responses={
             200: OfferDetailSerializer,
             401: OpenApiResponse(description="User is unauthorized"),
@@ -147,6 +195,46 @@ class OfferViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
 
+    @extend_schema(
+        request={JSONLinesParser.media_type: OfferBulkSerializer},
+        responses={
+            200: OpenApiResponse(description="One JSON line per offer line: its line number, status and id or errors"),
+            401: OpenApiResponse(description="User is unauthorized"),
+            403: OpenApiResponse(description="User is no business user"),
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[JSONLinesParser])
+    def bulk_import(self, request):
+        """
+        Creates offers for the current user from a JSON Lines body, one offer per line.
+
+        Each line is validated like a POST to the offers endpoint (without
+        image); valid offers are saved in chunked transactions. The result
+        of every line is streamed back as it becomes available. The writes
+        happen while the response streams, so a chunk that fails in the
+        database is rolled back and reported as an error line for each of
+        its offers instead of cutting the response short.
+        """
+        results = import_offers(request.data, request.user)
+        return StreamingHttpResponse(to_json_lines(results), content_type=JSONLinesParser.media_type)
+
+    @extend_schema(
+        responses={
+            (200, JSONLinesParser.media_type): OfferBulkSerializer,
+            401: OpenApiResponse(description="User is unauthorized"),
+        }
+    )
+    @action(detail=False, methods=['get'], url_path='export')
+    def bulk_export(self, request):
+        """
+        Streams the offers as JSON Lines in the import format.
+
+        Accepts the same filter, search and ordering parameters as the list.
+        Offers are read in chunks, so memory use does not grow with the catalog.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(to_json_lines(export_offers(queryset)), content_type=JSONLinesParser.media_type)
+
 
 @extend_schema(
     tags=['Offers'],
@@ -157,13 +245,16 @@ class OfferViewSet(viewsets.ModelViewSet):
         404: OpenApiResponse(description="Offer detail not found"),
     }
 )
-class OfferDetailView(generics.RetrieveAPIView):
+class OfferDetailView(CachedRetrieveMixin, generics.RetrieveAPIView):
     """
     API view to retrieve details of a specific offer.
 
+    Responses are cached until the detail's offer changes.
+
     Methods:
         get: Retrieve offer details by ID.
     """
     queryset = OfferDetail.objects.all()
+    retrieve_cache_offer_attr = 'offer_id'
     serializer_class = OfferDetailDetailsSerializer
     permission_classes = [IsAuthenticated]
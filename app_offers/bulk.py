@@ -0,0 +1,137 @@
+"""
+Bulk import and export of offers as JSON Lines (one JSON object per line).
+
+Both directions work on iterators, so neither an import nor the catalog is
+ever held in memory as a whole: imported lines are validated one by one and
+written in chunks, exported offers are read from the database in chunks.
+Used by the offers import/export endpoints and the 'import_offers' and
+'export_offers' management commands.
+"""
+import json
+import logging
+
+from django.db import transaction, DatabaseError
+from rest_framework.utils.encoders import JSONEncoder
+
+from app_offers.api.serializers import OfferBulkSerializer
+from app_offers.models import Offer, OfferDetail
+from app_offers.signals import offers_bulk_created
+
+CHUNK_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+def validate_line(line):
+    """
+    Parses and validates one JSON line.
+
+    Returns a (validated_data, errors) tuple, one of which is None.
+    """
+    try:
+        data = json.loads(line)
+    except ValueError as exc:
+        return None, {'non_field_errors': [f"Invalid JSON: {exc}"]}
+    if not isinstance(data, dict):
+        return None, {'non_field_errors': ["Expected a JSON object."]}
+    serializer = OfferBulkSerializer(data=data)
+    if not serializer.is_valid():
+        return None, serializer.errors
+    return serializer.validated_data, None
+
+
+def create_offers(validated_items, user, using='default'):
+    """
+    Inserts offers with their details for the given user in one transaction.
+
+    Uses one bulk insert for the offers and one for all their details, then
+    sends 'offers_bulk_created' so the search index and the counters follow.
+    Returns the saved offers in input order.
+    """
+    built = [OfferBulkSerializer.build_offer(data, user) for data in validated_items]
+    offers = [offer for offer, _ in built]
+    with transaction.atomic(using=using):
+        Offer.objects.using(using).bulk_create(offers)
+        details = []
+        for offer, offer_details in built:
+            for detail in offer_details:
+                detail.offer = offer
+                details.append(detail)
+        OfferDetail.objects.using(using).bulk_create(details)
+        offers_bulk_created.send(sender=Offer, offers=offers, using=using)
+    return offers
+
+
+def import_offers(lines, user, chunk_size=CHUNK_SIZE, using='default'):
+    """
+    Creates offers for the given user from an iterable of JSON lines.
+
+    Yields one result per non-blank line, in input order: either
+    {'line': n, 'status': 'created', 'id': id} or
+    {'line': n, 'status': 'error', 'errors': {...}}.
+    Valid offers are written in transactions of 'chunk_size' offers, so an
+    invalid line never rolls back the others. If writing a chunk fails in
+    the database, that chunk is rolled back and its lines are reported as
+    errors, and the import goes on with the next chunk. Callers that stream
+    the results (see the import endpoint) have already sent their status
+    line, so a failure must not end the iteration.
+    """
+    results, pending = [], []
+
+    def flush():
+        try:
+            offers = create_offers([data for _, data in pending], user, using=using)
+        except DatabaseError:
+            logger.exception("Importing offers from lines %s-%s failed.", pending[0][0]['line'], pending[-1][0]['line'])
+            for result, _ in pending:
+                result.update(status='error', errors={'non_field_errors': ["The offer could not be saved."]})
+                del result['id']
+        else:
+            for (result, _), offer in zip(pending, offers):
+                result['id'] = offer.pk
+        yield from results
+        results.clear()
+        pending.clear()
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        data, errors = validate_line(line)
+        if errors is not None:
+            result = {'line': number, 'status': 'error', 'errors': errors}
+            if pending:
+                results.append(result)
+            else:
+                yield result
+            continue
+        result = {'line': number, 'status': 'created', 'id': None}
+        results.append(result)
+        pending.append((result, data))
+        if len(pending) >= chunk_size:
+            yield from flush()
+    if pending:
+        yield from flush()
+
+
+def export_offers(queryset=None, chunk_size=CHUNK_SIZE):
+    """
+    Yields the given offers (all by default) in the import format.
+
+    Offers are streamed from the database in chunks of 'chunk_size' with
+    their details prefetched per chunk, ordered by id unless the queryset
+    is ordered already.
+    """
+    if queryset is None:
+        queryset = Offer.objects.all()
+    if not queryset.ordered:
+        queryset = queryset.order_by('pk')
+    for offer in queryset.prefetch_related('details').iterator(chunk_size=chunk_size):
+        yield OfferBulkSerializer(offer).data
+
+
+def to_json_lines(items):
+    """
+    Encodes an iterable of dicts as JSON lines.
+    """
+    for item in items:
+        yield json.dumps(item, cls=JSONEncoder) + '\n'
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from app_offers.models import Offer
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the stored min_price and min_delivery_time of every offer.
+
+    Usage:
+        python manage.py backfill_offer_min_values
+    """
+    help = "Recomputes the denormalized min_price and min_delivery_time columns of all offers."
+
+    def handle(self, *args, **options):
+        updated = Offer.objects.all().refresh_min_values()
+        self.stdout.write(self.style.SUCCESS(f"Updated min values of {updated} offers."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from app_offers.bulk import CHUNK_SIZE, export_offers, to_json_lines
+
+
+class Command(BaseCommand):
+    """
+    Exports all offers with their details as JSON Lines, in the import format.
+
+    Usage:
+        python manage.py export_offers > offers.jsonl
+        python manage.py export_offers --output offers.jsonl
+    """
+    help = "Writes all offers as JSON Lines to stdout or a file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="File to write instead of stdout.")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Offers read per database query.")
+
+    def handle(self, *args, **options):
+        lines = to_json_lines(export_offers(chunk_size=options['chunk_size']))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
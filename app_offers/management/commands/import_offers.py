@@ -0,0 +1,43 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from app_offers.bulk import CHUNK_SIZE, import_offers
+
+
+class Command(BaseCommand):
+    """
+    Imports offers from a JSON Lines file, one offer with its details per line.
+
+    Usage:
+        python manage.py import_offers offers.jsonl --user <username>
+        python manage.py import_offers - --user <username> < offers.jsonl
+    """
+    help = "Creates offers for a business user from a JSON Lines file ('-' reads stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to read, or '-' for stdin.")
+        parser.add_argument('--user', required=True, help="Username of the business user who owns the offers.")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Offers saved per transaction.")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['user'], profile__type='business').first()
+        if user is None:
+            raise CommandError(f"No business user named '{options['user']}'.")
+
+        if options['path'] == '-':
+            self.import_lines(sys.stdin.buffer, user, options['chunk_size'])
+        else:
+            with open(options['path'], 'rb') as lines:
+                self.import_lines(lines, user, options['chunk_size'])
+
+    def import_lines(self, lines, user, chunk_size):
+        created = failed = 0
+        for result in import_offers(lines, user, chunk_size=chunk_size):
+            if result['status'] == 'created':
+                created += 1
+            else:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"Line {result['line']}: {dict(result['errors'])}"))
+        self.stdout.write(self.style.SUCCESS(f"Created {created} offers, {failed} lines failed."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from app_offers.search import rebuild_search_index, search_index_available
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the full-text search index of offer titles and descriptions.
+
+    Usage:
+        python manage.py rebuild_offer_search_index
+    """
+    help = "Rebuilds the FTS5 search index of offers from the offers table."
+
+    def handle(self, *args, **options):
+        if not search_index_available():
+            self.stdout.write(self.style.WARNING("No search index on this database, search uses LIKE lookups."))
+            return
+        indexed = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} offers."))
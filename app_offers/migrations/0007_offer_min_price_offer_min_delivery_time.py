@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:04
+
+from django.db import migrations, models
+from django.db.models import Min, OuterRef, Subquery
+
+
+def backfill_min_values(apps, schema_editor):
+    Offer = apps.get_model('app_offers', 'Offer')
+    OfferDetail = apps.get_model('app_offers', 'OfferDetail')
+    details = OfferDetail.objects.filter(offer=OuterRef('pk')).order_by().values('offer')
+    Offer.objects.update(
+        min_price=Subquery(details.annotate(value=Min('price')).values('value')),
+        min_delivery_time=Subquery(details.annotate(value=Min('delivery_time_in_days')).values('value')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_offers', '0006_alter_offer_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='min_delivery_time',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, help_text='Lowest delivery time in days among the offer details', null=True),
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='min_price',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, help_text='Lowest price among the offer details', null=True),
+        ),
+        migrations.RunPython(backfill_min_values, migrations.RunPython.noop),
+    ]
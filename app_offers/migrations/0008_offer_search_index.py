@@ -0,0 +1,50 @@
+from django.db import migrations, transaction, OperationalError
+
+# The SQL is kept here rather than imported from app_offers.search, so later
+# changes to the runtime module cannot change what this migration does.
+FTS_TABLE = 'app_offers_offer_fts'
+
+
+def fts5_supported(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    try:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(content)")
+            cursor.execute("DROP TABLE temp.fts5_probe")
+    except OperationalError:
+        return False
+    return True
+
+
+def create_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if not fts5_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5(title, description, tokenize='unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+            f"SELECT id, title, description FROM app_offers_offer"
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_offers', '0007_offer_min_price_offer_min_delivery_time'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_offers', '0008_offer_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['user', 'updated_at'], name='offer_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['updated_at'], name='offer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offerdetail',
+            index=models.Index(fields=['offer', 'offer_type'], name='offerdetail_offer_type_idx'),
+        ),
+    ]
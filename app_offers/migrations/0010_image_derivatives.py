@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_offers', '0009_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='File names of the resized image versions by size name'),
+        ),
+    ]
@@ -1,17 +1,46 @@
 from django.db import models
+from django.db.models import Min, OuterRef, Subquery
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 
-from core.utils import overwrite_file_upload
+from core.storage import ContentAddressedFileField, content_addressed_upload
+from core.utils import TrackChangesMixin
 
 
-class Offer(models.Model):
+class OfferQuerySet(models.QuerySet):
+    def refresh_min_values(self):
+        """
+        Recomputes the stored min_price and min_delivery_time of the offers
+        in this queryset from their details in a single UPDATE statement.
+        """
+        details = OfferDetail.objects.filter(offer=OuterRef('pk')).order_by().values('offer')
+        return self.update(
+            min_price=Subquery(details.annotate(value=Min('price')).values('value')),
+            min_delivery_time=Subquery(details.annotate(value=Min('delivery_time_in_days')).values('value')),
+        )
+
+
+class Offer(TrackChangesMixin, models.Model):
+    tracked_fields = ('image',)
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     title = models.CharField(max_length=200)
-    image = models.FileField(upload_to=overwrite_file_upload, null=True, blank=True)
+    image = ContentAddressedFileField(upload_to=content_addressed_upload, null=True, blank=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False, help_text="File names of the resized image versions by size name")
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    min_price = models.IntegerField(null=True, blank=True, editable=False, db_index=True, help_text="Lowest price among the offer details")
+    min_delivery_time = models.IntegerField(null=True, blank=True, editable=False, db_index=True, help_text="Lowest delivery time in days among the offer details")
+
+    objects = OfferQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # ?creator_id= combined with ?ordering=updated_at, and the default newest-first cursor
+            models.Index(fields=['user', 'updated_at'], name='offer_user_updated_idx'),
+            models.Index(fields=['updated_at'], name='offer_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -32,6 +61,12 @@ class OfferDetail(models.Model):
     offer_type = models.CharField(max_length=100, choices=TYPE_CHOICES)
     features = models.JSONField(default=list, blank=True)
 
+    class Meta:
+        indexes = [
+            # detail lookup by offer and tier when updating an offer
+            models.Index(fields=['offer', 'offer_type'], name='offerdetail_offer_type_idx'),
+        ]
+
     def __str__(self):
         return f"Detail {self.id} for Offer {self.offer_id}"
 
@@ -0,0 +1,98 @@
+"""
+Full-text search index for offer titles and descriptions.
+
+On SQLite the index is an FTS5 virtual table that mirrors 'title' and
+'description' of every offer under the offer id as rowid. It is created by
+migration 0008, kept in sync by the Offer signals and can be rebuilt with
+the 'rebuild_offer_search_index' management command. On other databases,
+or SQLite builds without FTS5, search falls back to DRF's LIKE lookups.
+"""
+import re
+
+from django.db import connections
+
+OFFER_TABLE = 'app_offers_offer'
+FTS_TABLE = 'app_offers_offer_fts'
+
+_availability = {}
+
+
+def search_index_available(using='default'):
+    """
+    Returns True if the FTS5 table exists on the given database.
+
+    Only lasting answers are remembered per database: a table that exists,
+    or a database that is not SQLite. A missing table is looked up again on
+    the next call, so a process started before migration 0008 picks up the
+    index as soon as it exists. The remembered answers are dropped after
+    every migrate (see clear_search_index_availability).
+    """
+    connection = connections[using]
+    key = (using, str(connection.settings_dict['NAME']))
+    if key not in _availability:
+        if connection.vendor != 'sqlite':
+            _availability[key] = False
+        elif FTS_TABLE in connection.introspection.table_names():
+            _availability[key] = True
+        else:
+            return False
+    return _availability[key]
+
+
+def clear_search_index_availability(**kwargs):
+    """
+    Forgets the remembered availability of the index; connected to post_migrate.
+    """
+    _availability.clear()
+
+
+def index_offers(offers, using='default'):
+    """
+    Adds or replaces the index entries of the given offers.
+    """
+    if not search_index_available(using):
+        return
+    rows = [(offer.pk, offer.title, offer.description) for offer in offers]
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [row[:1] for row in rows])
+        cursor.executemany(f"INSERT INTO {FTS_TABLE} (rowid, title, description) VALUES (%s, %s, %s)", rows)
+
+
+def remove_offers(offer_ids, using='default'):
+    """
+    Removes the index entries of the given offer ids.
+    """
+    if not search_index_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in offer_ids])
+
+
+def rebuild_search_index(using='default'):
+    """
+    Rebuilds the whole index from the offers table and returns the number of indexed offers.
+    """
+    if not search_index_available(using):
+        return 0
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+            f"SELECT id, title, description FROM {OFFER_TABLE}"
+        )
+        return cursor.rowcount
+
+
+def build_match_query(terms):
+    """
+    Turns search terms into an FTS5 query.
+
+    Every term is quoted (so user input cannot inject FTS5 syntax) and
+    matched as a prefix; all terms must match, like DRF's SearchFilter.
+    Returns None if no term contains a searchable character.
+    """
+    phrases = [
+        '"{}"*'.format(term.replace('"', '""'))
+        for term in terms if re.search(r'\w', term)
+    ]
+    return ' '.join(phrases) or None
@@ -0,0 +1,157 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import receiver, Signal
+
+from app_offers.api.caching import OFFER_LIST_VERSION, offer_version_name
+from app_offers.models import Offer, OfferDetail
+from app_offers.search import index_offers, remove_offers, clear_search_index_availability
+from core.cache import bump_cache_version, count_version_name
+from core.images import register_image_derivatives, derivatives_updated
+from core.utils import register_file_cleanup
+
+# Sent with 'offers' (saved Offer instances) and 'using' after a bulk insert,
+# which bypasses post_save. Receivers run inside the inserting transaction.
+offers_bulk_created = Signal()
+
+register_file_cleanup(Offer)
+register_image_derivatives(Offer, 'image', 'image_derivatives')
+post_migrate.connect(clear_search_index_availability, dispatch_uid='clear_search_index_availability')
+
+
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+def refresh_offer_min_values(sender, instance, origin=None, **kwargs):
+    """
+    Keeps the stored min_price and min_delivery_time of the parent offer in
+    sync whenever one of its details is saved or deleted.
+
+    Details removed by a cascading delete of their offer (or its owner) are
+    skipped, because the offer row is about to disappear as well.
+    """
+    if is_cascade(OfferDetail, origin):
+        return
+    Offer.objects.filter(pk=instance.offer_id).refresh_min_values()
+
+
+@receiver(post_save, sender=Offer)
+def invalidate_offer_counts_on_create(sender, instance, created, **kwargs):
+    """
+    Drops cached offer list counts when a new offer is created.
+    """
+    if created:
+        bump_cache_version(count_version_name(Offer))
+
+
+@receiver(offers_bulk_created, sender=Offer)
+def invalidate_offer_counts_on_bulk_create(sender, offers, **kwargs):
+    """
+    Drops cached offer list counts after a bulk import.
+    """
+    bump_cache_version(count_version_name(Offer))
+
+
+@receiver(post_delete, sender=Offer)
+def invalidate_offer_counts_on_delete(sender, instance, **kwargs):
+    """
+    Drops cached offer list counts when an offer is deleted.
+    """
+    bump_cache_version(count_version_name(Offer))
+
+
+@receiver(post_save, sender=Offer)
+def index_offer_for_search(sender, instance, update_fields=None, using='default', **kwargs):
+    """
+    Updates the search index entry of an offer when its title or description may have changed.
+    """
+    if update_fields is None or {'title', 'description'} & set(update_fields):
+        index_offers([instance], using=using)
+
+
+@receiver(offers_bulk_created, sender=Offer)
+def index_bulk_created_offers(sender, offers, using='default', **kwargs):
+    """
+    Adds bulk imported offers to the search index.
+    """
+    index_offers(offers, using=using)
+
+
+@receiver(post_delete, sender=Offer)
+def remove_offer_from_search(sender, instance, using='default', **kwargs):
+    """
+    Removes a deleted offer from the search index.
+    """
+    remove_offers([instance.pk], using=using)
+
+
+def is_cascade(sender, origin):
+    """
+    Returns True if a post_delete was caused by deleting a row of another model.
+    """
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin is not None and origin_model is not sender
+
+
+def invalidate_offer_lists():
+    """
+    Drops cached offer list responses, now and again once the transaction
+    commits (so a list rendered in between is not kept either).
+    """
+    bump_cache_version(OFFER_LIST_VERSION)
+    transaction.on_commit(lambda: bump_cache_version(OFFER_LIST_VERSION))
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_save, sender=OfferDetail)
+@receiver(offers_bulk_created, sender=Offer)
+@receiver(derivatives_updated, sender=Offer)
+def invalidate_offer_lists_on_save(sender, **kwargs):
+    invalidate_offer_lists()
+
+
+@receiver(post_delete, sender=Offer)
+@receiver(post_delete, sender=OfferDetail)
+@receiver(post_delete, sender=User)
+def invalidate_offer_lists_on_delete(sender, origin=None, **kwargs):
+    """
+    Drops cached offer lists once per delete; rows removed by a cascade are
+    covered by the receiver call for the deleted parent.
+    """
+    if not is_cascade(sender, origin):
+        invalidate_offer_lists()
+
+
+@receiver(post_save, sender=User)
+def invalidate_offer_lists_on_user_change(sender, created, update_fields=None, **kwargs):
+    """
+    Drops cached offer lists when an existing user (an offer owner's name) changes.
+    """
+    if not created and set(update_fields or ()) != {'last_login'}:
+        invalidate_offer_lists()
+
+
+def invalidate_offer(offer_id):
+    """
+    Drops cached payloads of one offer and its details, now and again on commit.
+    """
+    bump_cache_version(offer_version_name(offer_id))
+    transaction.on_commit(lambda: bump_cache_version(offer_version_name(offer_id)))
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+def invalidate_cached_offer(sender, instance, **kwargs):
+    invalidate_offer(instance.pk)
+
+
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+def invalidate_cached_offer_of_detail(sender, instance, origin=None, **kwargs):
+    if not is_cascade(sender, origin):
+        invalidate_offer(instance.offer_id)
+
+
+@receiver(derivatives_updated, sender=Offer)
+def invalidate_cached_offer_images(sender, pk, **kwargs):
+    invalidate_offer(pk)
@@ -1,13 +1,34 @@
+import io
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+from PIL import Image
+
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, IntegrityError
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import parse_http_date
 from django.contrib.auth.models import User
 from rest_framework import status
+from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.test import APITestCase, APIClient
 from rest_framework.authtoken.models import Token
 
-from app_offers.models import Offer
+from app_offers import bulk
+from app_offers.models import Offer, OfferDetail
+from app_offers.search import FTS_TABLE, clear_search_index_availability, search_index_available
 
 from ..api.serializers import OfferDetailDetailsSerializer, OffersSerializer
+from ..api.views import OfferDetailView, OfferViewSet
+from ..api.caching import OFFER_LIST_VERSION, object_cache, offer_version_name
+from ..api.pagination import CachedCountPagination
 from app_auth.models import UserProfile
+from core.cache import bump_cache_version, check_version_cache
 
 
 class OfferAPITests(APITestCase):
@@ -46,6 +67,19 @@ class OfferAPITests(APITestCase):
 
         self.assertEqual(response.data['results'][0], {'id': 1, 'title': 'Test Offer', 'description': 'This is a test offer.', 'min_price': '100.00', 'min_delivery_time': 5, 'user': 1, 'image': None, 'created_at': response.data['results'][0]['created_at'], 'updated_at': response.data['results'][0]['updated_at'], 'details': [], 'user_details': {'first_name': '', 'last_name': '', 'username': 'testuser'}})
 
+    def test_min_values_follow_details(self):
+        offer = self.offers[0]
+        basic = OfferDetail.objects.create(offer=offer, title='Basic', price=50, delivery_time_in_days=3, offer_type='basic')
+        OfferDetail.objects.create(offer=offer, title='Premium', price=200, delivery_time_in_days=1, offer_type='premium')
+        offer.refresh_from_db()
+        self.assertEqual((offer.min_price, offer.min_delivery_time), (50, 1))
+
+        basic.delete()
+        offer.refresh_from_db()
+        self.assertEqual((offer.min_price, offer.min_delivery_time), (200, 1))
+
+        response = self.client.get(reverse('offers-list'), {'min_price': 150, 'ordering': 'min_price'})
+        self.assertEqual([item['id'] for item in response.data['results']], [offer.id])
     
 
     # def test_get_offers_list(self):
@@ -71,3 +105,532 @@ class OfferAPITests(APITestCase):
 
     #     self.assertEqual(response.status_code, status.HTTP_200_OK)
     #     self.assertEqual(response.data, expected_data)
+
+
+class OfferCursorPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='business', password='testpass')
+        UserProfile.objects.create(user=self.user, type='business')
+        prices = [30, 10, None, 20, 10, None, 40]
+        self.offers = [
+            Offer.objects.create(user=self.user, title=f'Offer {i}', description='Offer', min_price=price)
+            for i, price in enumerate(prices)
+        ]
+
+    def walk(self, ordering):
+        url = reverse('offers-list')
+        params = {'cursor': '', 'page_size': 2, 'ordering': ordering}
+        seen, pages = [], []
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            page = [item['id'] for item in response.data['results']]
+            seen += page
+            pages.append((response.data['previous'], page))
+            url, params = response.data['next'], None
+        return seen, pages
+
+    def test_cursor_pages_follow_min_price_ordering(self):
+        for ordering in ['min_price', '-min_price']:
+            descending = ordering.startswith('-')
+            priced = sorted((o for o in self.offers if o.min_price is not None),
+                            key=lambda o: (o.min_price, o.id), reverse=descending)
+            unpriced = sorted((o for o in self.offers if o.min_price is None),
+                              key=lambda o: o.id, reverse=descending)
+            seen, _ = self.walk(ordering)
+            self.assertEqual(seen, [o.id for o in priced + unpriced])
+
+    def test_previous_link_returns_previous_page(self):
+        _, pages = self.walk('-updated_at')
+        for (_, previous_page), (previous_link, _) in zip(pages, pages[1:]):
+            response = self.client.get(previous_link)
+            self.assertEqual([item['id'] for item in response.data['results']], previous_page)
+
+    def test_page_numbers_stay_default(self):
+        response = self.client.get(reverse('offers-list'))
+        self.assertEqual(response.data['count'], len(self.offers))
+
+
+class OfferCountCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='business', password='testpass')
+        UserProfile.objects.create(user=self.user, type='business')
+        for i in range(5):
+            Offer.objects.create(user=self.user, title=f'Offer {i}', description='Offer')
+
+    def count_queries(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('offers-list'), params)
+        return response, [q['sql'] for q in queries if 'COUNT(' in q['sql']]
+
+    def test_count_is_cached_per_normalized_query(self):
+        response, counts = self.count_queries({'search': 'Offer'})
+        self.assertEqual((response.data['count'], response.data['count_is_exact']), (5, True))
+        self.assertEqual(len(counts), 1)
+
+        response, counts = self.count_queries({'search': ' offer ', 'page': 1, 'ordering': 'min_price'})
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(counts, [])
+
+    def test_count_cache_is_invalidated_on_create_and_delete(self):
+        self.count_queries({})
+        offer = Offer.objects.create(user=self.user, title='New', description='Offer')
+        response, counts = self.count_queries({})
+        self.assertEqual((response.data['count'], len(counts)), (6, 1))
+
+        offer.delete()
+        response, counts = self.count_queries({})
+        self.assertEqual((response.data['count'], len(counts)), (5, 1))
+
+    @mock.patch.object(CachedCountPagination, 'exact_count_limit', 2)
+    def test_large_counts_are_estimated(self):
+        response = self.client.get(reverse('offers-list'), {'page_size': 2})
+        self.assertFalse(response.data['count_is_exact'])
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(reverse('offers-list'), {'page_size': 2, 'page': 3})
+        self.assertEqual((response.data['count'], response.data['count_is_exact']), (5, True))
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+
+
+class OfferSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='business', password='testpass')
+        UserProfile.objects.create(user=self.user, type='business')
+        self.logo = Offer.objects.create(user=self.user, title='Logo', description='Includes a web design mockup')
+        self.web = Offer.objects.create(user=self.user, title='Web design', description='Responsive layout')
+        self.other = Offer.objects.create(user=self.user, title='Copywriting', description='Texts')
+
+    def search(self, term, **params):
+        response = self.client.get(reverse('offers-list'), {'search': term, **params})
+        return [item['id'] for item in response.data['results']]
+
+    def test_search_matches_prefixes_ranked_by_relevance(self):
+        self.assertEqual(self.search('desig'), [self.web.id, self.logo.id])
+        self.assertEqual(self.search('web respons'), [self.web.id])
+
+    def test_index_follows_offer_changes(self):
+        self.other.title = 'Web copywriting'
+        self.other.save()
+        self.assertIn(self.other.id, self.search('web'))
+
+        self.web.delete()
+        self.assertNotIn(self.web.id, self.search('web'))
+
+    def test_explicit_ordering_overrides_rank(self):
+        self.assertEqual(self.search('design', ordering='updated_at'), [self.logo.id, self.web.id])
+
+    def test_missing_index_is_looked_up_again(self):
+        clear_search_index_availability()
+        with connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {FTS_TABLE} RENAME TO offer_fts_hidden")
+            self.assertFalse(search_index_available())
+            cursor.execute(f"ALTER TABLE offer_fts_hidden RENAME TO {FTS_TABLE}")
+        self.assertTrue(search_index_available())
+
+
+class OfferQueryCountTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(10):
+            user = User.objects.create(username=f'business{i}')
+            offer = Offer.objects.create(user=user, title=f'Offer {i}', description='Offer')
+            for offer_type in ['basic', 'standard', 'premium']:
+                OfferDetail.objects.create(offer=offer, title=offer_type, price=10, offer_type=offer_type)
+        self.client.force_authenticate(user)
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_list_query_count_does_not_grow_with_page_size(self):
+        small_page = self.count_queries(reverse('offers-list'), {'page_size': 2})
+        cache.clear()
+        large_page = self.count_queries(reverse('offers-list'), {'page_size': 10})
+        self.assertEqual(small_page, large_page)
+        self.assertLessEqual(large_page, 3)
+
+    def test_retrieve_uses_bounded_queries(self):
+        offer = Offer.objects.first()
+        self.assertLessEqual(self.count_queries(reverse('offers-detail', kwargs={'pk': offer.pk})), 2)
+
+
+class OfferWriteTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='business')
+        UserProfile.objects.create(user=self.user, type='business')
+        self.client.force_authenticate(self.user)
+
+    def offer_data(self, tiers):
+        return {
+            'title': 'Offer',
+            'description': 'Offer',
+            'details': [
+                {'title': offer_type, 'revisions': 1, 'delivery_time_in_days': days, 'price': price,
+                 'features': ['feature'], 'offer_type': offer_type}
+                for offer_type, price, days in tiers
+            ],
+        }
+
+    def create_offer(self, tiers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('offers-list'), self.offer_data(tiers), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Offer.objects.get(pk=response.data['id']), len(queries)
+
+    def test_create_uses_fixed_number_of_statements(self):
+        offer, three_details = self.create_offer([('basic', 100, 7), ('standard', 200, 5), ('premium', 300, 3)])
+        _, five_details = self.create_offer([('basic', 100, 7)] * 3 + [('premium', 300, 3)] * 2)
+        self.assertEqual(three_details, five_details)
+        self.assertEqual(offer.details.count(), 3)
+        self.assertEqual((offer.min_price, offer.min_delivery_time), (100, 3))
+
+    def test_patch_updates_details_in_bulk(self):
+        offer, _ = self.create_offer([('basic', 100, 7), ('standard', 200, 5), ('premium', 300, 3)])
+        data = {'details': [{'offer_type': 'basic', 'price': 150}, {'offer_type': 'premium', 'delivery_time_in_days': 9}]}
+        response = self.client.patch(reverse('offers-detail', kwargs={'pk': offer.pk}), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        offer.refresh_from_db()
+        self.assertEqual(offer.details.get(offer_type='basic').price, 150)
+        self.assertEqual((offer.min_price, offer.min_delivery_time), (150, 5))
+
+    def test_patch_with_unknown_offer_type_changes_nothing(self):
+        offer, _ = self.create_offer([('basic', 100, 7), ('standard', 200, 5), ('premium', 300, 3)])
+        data = {'title': 'Changed', 'details': [{'offer_type': 'basic', 'price': 1}, {'offer_type': 'gold', 'price': 1}]}
+        response = self.client.patch(reverse('offers-detail', kwargs={'pk': offer.pk}), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        offer.refresh_from_db()
+        self.assertEqual((offer.title, offer.min_price), ('Offer', 100))
+
+
+class OfferBulkTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='business')
+        UserProfile.objects.create(user=self.user, type='business')
+        self.client.force_authenticate(self.user)
+
+    def offer_line(self, title, base_price=100):
+        return json.dumps({
+            'title': title,
+            'description': f'{title} description',
+            'details': [
+                {'title': offer_type, 'revisions': 1, 'delivery_time_in_days': 7 - step,
+                 'price': base_price + 100 * step, 'features': [], 'offer_type': offer_type}
+                for step, offer_type in enumerate(['basic', 'standard', 'premium'])
+            ],
+        })
+
+    def import_lines(self, lines):
+        response = self.client.post(
+            reverse('offers-bulk-import'), '\n'.join(lines), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_import_reports_every_line(self):
+        lines = [
+            self.offer_line('Logo design'),
+            '{not json',
+            json.dumps({'title': 'Too few details', 'description': 'x', 'details': []}),
+            '',
+            self.offer_line('Website', base_price=500),
+        ]
+        results = self.import_lines(lines)
+
+        self.assertEqual([(r['line'], r['status']) for r in results],
+                         [(1, 'created'), (2, 'error'), (3, 'error'), (5, 'created')])
+        self.assertIn('details', results[2]['errors'])
+        website = Offer.objects.get(pk=results[3]['id'])
+        self.assertEqual((website.user, website.min_price, website.min_delivery_time), (self.user, 500, 5))
+        self.assertEqual(website.details.count(), 3)
+
+    def test_imported_offers_are_searchable_and_counted(self):
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('offers-list')).data['count'], 0)
+        self.import_lines([self.offer_line('Logo design'), self.offer_line('Website')])
+        response = self.client.get(reverse('offers-list'), {'search': 'logo'})
+        self.assertEqual([offer['title'] for offer in response.data['results']], ['Logo design'])
+        self.assertEqual(self.client.get(reverse('offers-list')).data['count'], 2)
+
+    def test_export_round_trips_through_import(self):
+        self.import_lines([self.offer_line('Logo design'), self.offer_line('Website')])
+        response = self.client.get(reverse('offers-bulk-export'))
+        exported = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['title'] for line in exported], ['Logo design', 'Website'])
+
+        results = self.import_lines(exported)
+        self.assertEqual([r['status'] for r in results], ['created', 'created'])
+        self.assertEqual(Offer.objects.count(), 4)
+
+    def test_failed_chunk_is_reported_and_the_import_goes_on(self):
+        create_offers, calls = bulk.create_offers, []
+
+        def fail_first_chunk(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 1:
+                raise IntegrityError('duplicate key')
+            return create_offers(*args, **kwargs)
+
+        lines = [self.offer_line('Logo design'), self.offer_line('Website')]
+        with mock.patch.object(bulk, 'create_offers', fail_first_chunk), self.assertLogs('app_offers.bulk', 'ERROR'):
+            results = list(bulk.import_offers(lines, self.user, chunk_size=1))
+        self.assertEqual([(r['line'], r['status']) for r in results], [(1, 'error'), (2, 'created')])
+        self.assertEqual(list(Offer.objects.values_list('title', flat=True)), ['Website'])
+
+    def test_import_requires_business_user(self):
+        customer = User.objects.create(username='customer')
+        UserProfile.objects.create(user=customer, type='customer')
+        self.client.force_authenticate(customer)
+        response = self.client.post(
+            reverse('offers-bulk-import'), self.offer_line('Logo design'), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class OfferImageDerivativeTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, BACKGROUND_TASKS_ENABLED=False,
+            IMAGE_DERIVATIVE_SIZES={'thumbnail': (40, 30)})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create(username='business')
+        self.offer = Offer.objects.create(user=self.user, title='Offer', description='Offer')
+
+    def upload(self, offer, name='logo.png', color='red'):
+        content = io.BytesIO()
+        Image.new('RGB', (200, 100), color).save(content, format='PNG')
+        offer.image = SimpleUploadedFile(name, content.getvalue())
+        with self.captureOnCommitCallbacks(execute=True):
+            offer.save()
+        offer.refresh_from_db()
+        return offer
+
+    def test_upload_renders_content_hashed_derivatives(self):
+        offer = self.upload(self.offer)
+        name = offer.image_derivatives['thumbnail']
+        self.assertRegex(name, r'^offers/[0-9a-f]{2}/derivatives/[0-9a-f]{64}\.thumbnail\.[0-9a-f]{12}\.webp$')
+        with offer.image.storage.open(name) as derivative:
+            self.assertEqual(Image.open(derivative).size, (40, 30))
+
+        response = self.client.get(reverse('offers-list'))
+        self.assertTrue(response.data['results'][0]['image_derivatives']['thumbnail'].endswith(name))
+
+    def test_replacing_image_replaces_derivatives(self):
+        offer = self.upload(self.offer)
+        old_name = offer.image_derivatives['thumbnail']
+        offer = self.upload(offer, color='blue')
+        new_name = offer.image_derivatives['thumbnail']
+        self.assertNotEqual(old_name, new_name)
+        self.assertFalse(offer.image.storage.exists(old_name))
+        self.assertTrue(offer.image.storage.exists(new_name))
+
+    def test_non_image_files_get_no_derivatives(self):
+        self.offer.image = SimpleUploadedFile('brief.txt', b'not an image')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offer.save()
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.image_derivatives, {})
+
+
+class OfferListResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='business')
+        self.offer = Offer.objects.create(user=self.user, title='Logo design', description='Logo')
+        self.detail = OfferDetail.objects.create(offer=self.offer, title='Basic', price=100, offer_type='basic')
+        self.url = reverse('offers-list')
+
+    def test_conditional_get_skips_the_database(self):
+        response = self.client.get(self.url, {'ordering': 'min_price'})
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'ordering': ' min_price'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'ordering': 'min_price'}, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_repeated_list_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker'},
+            'versions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+        },
+        CACHE_VERSION_ALIAS='versions')
+    def test_stamps_live_in_the_shared_version_cache(self):
+        response = self.client.get(self.url)
+        version = caches['versions'].get(f'version:{OFFER_LIST_VERSION}')
+        self.assertGreaterEqual(parse_http_date(response['Last-Modified']), version)
+
+        # a write handled by another worker only reaches this one through the shared cache
+        caches['versions'].set(f'version:{OFFER_LIST_VERSION}', version + 0.001, None)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deploy_check_warns_about_a_per_process_version_cache(self):
+        self.assertEqual([warning.id for warning in check_version_cache(None)], ['core.W001'])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}):
+            self.assertEqual(check_version_cache(None), [])
+
+    def test_offer_and_detail_writes_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.detail.price = 50
+            self.detail.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['min_price'], 50)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Jane'
+            self.user.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.data['results'][0]['user_details']['first_name'], 'Jane')
+
+
+class OfferRetrieveCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        object_cache.clear()
+        self.user = User.objects.create(username='business')
+        self.offer = Offer.objects.create(user=self.user, title='Logo design', description='Logo')
+        self.detail = OfferDetail.objects.create(offer=self.offer, title='Basic', price=100, offer_type='basic')
+        self.client.force_authenticate(user=self.user)
+        self.offer_url = reverse('offers-detail', args=[self.offer.pk])
+        self.detail_url = reverse('offer-detail', args=[self.detail.pk])
+
+    def test_repeated_reads_run_no_queries(self):
+        for url in [self.offer_url, self.detail_url]:
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(second.status_code, status.HTTP_200_OK)
+            self.assertEqual(second.data, first.data)
+
+    def test_offer_and_detail_writes_invalidate_cached_payloads(self):
+        self.client.get(self.offer_url)
+        self.client.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.detail.price = 50
+            self.detail.save()
+        self.assertEqual(self.client.get(self.detail_url).data['price'], 50)
+        self.assertEqual(self.client.get(self.offer_url).data['min_price'], 50)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offer.delete()
+        self.assertEqual(self.client.get(self.offer_url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_write_in_another_process_invalidates_cached_payloads(self):
+        self.client.get(self.detail_url)
+        # another worker's write: the row and the shared stamp change, the
+        # payload cached in this process is left alone
+        OfferDetail.objects.filter(pk=self.detail.pk).update(price=75)
+        bump_cache_version(offer_version_name(self.offer.pk))
+        self.assertEqual(self.client.get(self.detail_url).data['price'], 75)
+
+    def test_cached_views_have_no_object_permissions(self):
+        # cache hits skip check_object_permissions, which is only safe while
+        # these views check no permissions per object
+        offer_view = OfferViewSet(action='retrieve', request=None, format_kwarg=None)
+        detail_view = OfferDetailView(request=None, format_kwarg=None)
+        self.assertFalse(offer_view.has_object_permissions())
+        self.assertFalse(detail_view.has_object_permissions())
+
+    def test_object_permissions_bypass_the_cache(self):
+        class IsOfferOwner(BasePermission):
+            def has_object_permission(self, request, view, obj):
+                return obj.offer.user == request.user
+
+        self.client.get(self.detail_url)
+        with mock.patch.object(OfferDetailView, 'permission_classes', [IsAuthenticated, IsOfferOwner]):
+            self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_200_OK)
+            self.client.force_authenticate(user=User.objects.create(username='other'))
+            self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class OfferSparseFieldsetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        object_cache.clear()
+        self.user = User.objects.create(username='business', first_name='Jane')
+        self.offer = Offer.objects.create(user=self.user, title='Logo design', description='Logo')
+        OfferDetail.objects.create(offer=self.offer, title='Basic', price=100, offer_type='basic')
+        self.client.force_authenticate(user=self.user)
+
+    def get_with_queries(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        offer_query = next(query['sql'] for query in queries if 'FROM "app_offers_offer"' in query['sql'] and 'COUNT' not in query['sql'])
+        return response.data, offer_query
+
+    def test_fields_trim_output_and_loaded_columns(self):
+        data, sql = self.get_with_queries(reverse('offers-list'), {'fields': 'id,title,user_details'})
+        self.assertEqual(data['results'][0], {
+            'id': self.offer.pk, 'title': 'Logo design',
+            'user_details': {'first_name': 'Jane', 'last_name': '', 'username': 'business'}})
+        self.assertNotIn('"description"', sql)
+        self.assertIn('"auth_user"."first_name"', sql)
+
+    def test_omit_drops_fields_and_joins(self):
+        data, sql = self.get_with_queries(reverse('offers-list'), {'omit': 'description,user_details', 'ordering': 'min_price'})
+        self.assertNotIn('description', data['results'][0])
+        self.assertEqual(data['results'][0]['details'][0]['id'], self.offer.details.get().pk)
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('auth_user', sql)
+
+        data, sql = self.get_with_queries(reverse('offers-detail', args=[self.offer.pk]), {'fields': 'title'})
+        self.assertEqual(data, {'title': 'Logo design'})
+        self.assertEqual(self.client.get(reverse('offers-detail', args=[self.offer.pk])).data['description'], 'Logo')
+
+
+class OfferFastListParityTests(APITestCase):
+    def setUp(self):
+        owner = User.objects.create(username='business', first_name='Jane', last_name='Doe')
+        other = User.objects.create(username='other')
+        for i, user in enumerate([owner, other, owner]):
+            offer = Offer.objects.create(user=user, title=f'Logo design {i}', description=f'Vector logo {i}')
+            for offer_type, price in [('basic', 100 + i), ('premium', 250.5)]:
+                OfferDetail.objects.create(offer=offer, title=offer_type, price=price, delivery_time_in_days=3 + i,
+                                           offer_type=offer_type, features=['Logo'])
+        Offer.objects.filter(pk=offer.pk).update(
+            image='offers/ab/logo.png', image_derivatives={'thumb': 'offers/ab/derivatives/logo.thumb.abc.webp'})
+        Offer.objects.create(user=other, title='Empty', description='No details yet')
+
+    def get_content(self, fast_list, params):
+        cache.clear()
+        with mock.patch.object(OfferViewSet, 'fast_list', fast_list):
+            response = self.client.get(reverse('offers-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.content
+
+    def test_fast_list_matches_serializer_output(self):
+        for params in [
+            {},
+            {'ordering': 'min_price', 'page_size': 2, 'page': 2},
+            {'cursor': '', 'ordering': '-min_price'},
+            {'search': 'logo', 'creator_id': User.objects.get(username='business').pk},
+            {'fields': 'id,details,user_details,image'},
+            {'omit': 'description,image_derivatives'},
+            {'format': 'json'},
+        ]:
+            with self.subTest(params=params):
+                self.assertEqual(self.get_content(True, params), self.get_content(False, params))
+
+    def test_fast_list_does_not_build_model_instances(self):
+        with mock.patch.object(Offer, 'from_db', side_effect=AssertionError):
+            self.get_content(True, {})
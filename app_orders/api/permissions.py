@@ -1,5 +1,5 @@
 from rest_framework import permissions
-from app_auth.models import UserProfile
+from app_auth.roles import get_profile_type
 
 
 class IsCustomerUser(permissions.BasePermission):
@@ -9,12 +9,7 @@ class IsCustomerUser(permissions.BasePermission):
     message = "Only customer users are allowed to perform this action."
 
     def has_permission(self, request, view):
-        if not request.user.is_authenticated:
-            return False
-        try:
-            return request.user.profile.type == 'customer'
-        except UserProfile.DoesNotExist:
-            return False
+        return get_profile_type(request) == 'customer'
 
 
 class IsAdminUser(permissions.BasePermission):
@@ -1,15 +1,18 @@
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import NotFound
 
 from ..models import Order
+from ..signals import orders_bulk_created
 from app_offers.models import OfferDetail
+from core.serializers import SparseFieldsetMixin
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for reading Order instances.
 
     Fields include users, order details, and status.
-    'features' is a list of strings.
+    'features' is a list of strings. Supports '?fields=' and '?omit='.
     """
     features = serializers.ListField(child=serializers.CharField(), allow_empty=True, read_only=True)
     customer_user = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -66,39 +69,64 @@ class OrderCreateUpdateSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['title', 'revisions', 'delivery_time_in_days', 'price', 'features', 'offer_type', 'status']
 
-    def create(self, validated_data, offer_detail=None, **kwargs):
+    def create(self, validated_data):
         """
-        Create Order, preferring OfferDetail from caller.
+        Create Order, preferring the OfferDetail passed to save().
 
-        If `offer_detail` is None, resolve it from `offer_detail_id`.
+        If no `offer_detail` was passed, resolve it from `offer_detail_id`.
         Raise 404 if OfferDetail not found.
         Returns created Order instance.
         """
+        offer_detail = validated_data.get('offer_detail')
         if offer_detail is None:
-            offer_detail_id = validated_data.pop('offer_detail_id', None)
+            offer_detail_id = validated_data.get('offer_detail_id')
             if not offer_detail_id:
                 raise serializers.ValidationError({"offer_detail_id": "This field is required."})
             try:
-                offer_detail = OfferDetail.objects.get(pk=offer_detail_id)
+                offer_detail = OfferDetail.objects.select_related('offer').get(pk=offer_detail_id)
             except OfferDetail.DoesNotExist:
                 raise NotFound("OfferDetail not found.")
-            
-        user = self.context['request'].user
-        
-        order = Order.objects.create(
-            title=offer_detail.title,
-            revisions=offer_detail.revisions,
-            delivery_time_in_days=offer_detail.delivery_time_in_days,
-            price=offer_detail.price,
-            features=offer_detail.features,
-            offer_type=offer_detail.offer_type,
-            customer_user=user,
-            business_user=offer_detail.offer.user,
-            status='in_progress',
-        )
+
+        order = Order.from_offer_detail(offer_detail, self.context['request'].user)
+        order.save(force_insert=True)
         return order
 
 
+class OrderBatchCreateSerializer(serializers.Serializer):
+    """
+    Serializer for creating one order per given offer detail id.
+
+    Ids may repeat to order the same detail more than once. All ids are
+    resolved in one query and the orders are saved with one bulk insert;
+    if any id does not exist, no order is created.
+    """
+    max_batch_size = 100
+
+    offer_detail_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=max_batch_size, write_only=True)
+
+    def validate_offer_detail_ids(self, value):
+        """
+        Resolves the ids to OfferDetail objects (with their offer) in one query.
+        """
+        offer_details = OfferDetail.objects.select_related('offer').in_bulk(set(value))
+        missing = sorted(set(value) - offer_details.keys())
+        if missing:
+            raise serializers.ValidationError(f"OfferDetail not found: {', '.join(map(str, missing))}.")
+        return [offer_details[pk] for pk in value]
+
+    def create(self, validated_data):
+        """
+        Creates the orders and returns them in the order of the given ids.
+        """
+        customer_user = self.context['request'].user
+        orders = [Order.from_offer_detail(detail, customer_user) for detail in validated_data['offer_detail_ids']]
+        with transaction.atomic():
+            Order.objects.bulk_create(orders)
+            orders_bulk_created.send(sender=Order, orders=orders)
+        return orders
+
+
 class OrderUpdateSerializer(OrderCreateUpdateSerializer):
     """
     Serializer for partial update of Order instances.
@@ -107,4 +135,15 @@ class OrderUpdateSerializer(OrderCreateUpdateSerializer):
     'Status' can be updated to completed or cancelled.
     """
     class Meta(OrderCreateUpdateSerializer.Meta):
-        read_only_fields = ['id', 'offer_detail_id', 'customer_user', 'business_user', 'title', 'revisions', 'delivery_time_in_days', 'price', 'features', 'offer_type', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['id', 'offer_detail_id', 'customer_user', 'business_user', 'title', 'revisions', 'delivery_time_in_days', 'price', 'features', 'offer_type', 'created_at', 'updated_at']
+
+
+class OrderStatsSerializer(serializers.Serializer):
+    """
+    Serializer for the order counts of one business user, one per status.
+    """
+    business_user_id = serializers.IntegerField(read_only=True)
+    in_progress = serializers.IntegerField(read_only=True, help_text="Number of orders in progress.")
+    completed = serializers.IntegerField(read_only=True, help_text="Number of completed orders.")
+    cancelled = serializers.IntegerField(read_only=True, help_text="Number of cancelled orders.")
+    total = serializers.IntegerField(read_only=True, help_text="Number of orders in any status.")
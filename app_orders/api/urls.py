@@ -2,8 +2,9 @@
 URL configuration for order-related endpoints.
 
 Defines RESTful routes for:
-- Managing orders through a viewset.
+- Managing orders through a viewset, including batch creation.
 - Retrieving total and completed order counts per user.
+- Retrieving order counts per status for one or many business users.
 
 Conventions:
 - Uses a router for the main order viewset.
@@ -12,15 +13,18 @@ Conventions:
 
 Example usage (reverse):
     reverse('orders-list')
+    reverse('orders-batch-create')
     reverse('order-count', args=[1])
     reverse('completed-order-count', args=[1])
+    reverse('order-stats', args=[1])
+    reverse('order-stats-batch')
 """
 
 from django.urls import path, include
 
 from rest_framework.routers import DefaultRouter
 
-from .views import OrderViewSet, OrderCountView, CompletedOrderCountView
+from .views import OrderViewSet, OrderCountView, CompletedOrderCountView, OrderStatsView, OrderStatsBatchView
 
 
 router = DefaultRouter()
@@ -29,5 +33,7 @@ router.register(r'orders', OrderViewSet, basename='orders')
 urlpatterns = [
     path('order-count/<int:business_user_id>/', OrderCountView.as_view(), name='order-count-inprogress'),
     path('completed-order-count/<int:business_user_id>/', CompletedOrderCountView.as_view(), name='order-count-completed'),
+    path('order-stats/', OrderStatsBatchView.as_view(), name='order-stats-batch'),
+    path('order-stats/<int:business_user_id>/', OrderStatsView.as_view(), name='order-stats'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,30 +1,39 @@
 from django.shortcuts import get_object_or_404
 
-from rest_framework import viewsets, generics
+from django.http import Http404
+
+from rest_framework import viewsets, generics, status
+from rest_framework.decorators import action
+from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.exceptions import MethodNotAllowed, ValidationError
 from rest_framework.permissions import IsAuthenticated
-from drf_spectacular.utils import extend_schema, OpenApiResponse
+from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParameter
 
 from ..models import Order
-from .serializers import OrderSerializer, OrderCreateUpdateSerializer, OrderUpdateSerializer
+from ..stats import get_order_stats
+from .serializers import OrderSerializer, OrderCreateUpdateSerializer, OrderUpdateSerializer, OrderStatsSerializer, OrderBatchCreateSerializer
 from .permissions import IsAdminUser, IsCustomerUser
 from app_offers.api.permissions import IsBusinessUser
 from app_offers.models import OfferDetail
 from app_auth.models import UserProfile
+from core.serializers import SPARSE_FIELDSET_PARAMETERS
+from core.views import SparseFieldsetViewMixin, FastListMixin
 
 
 @extend_schema(
     tags=['Orders'],
     description="API endpoint for managing orders.",
 )
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(SparseFieldsetViewMixin, FastListMixin, viewsets.ModelViewSet):
     """
     A viewset for viewing and editing order instances.
+    Lists are serialized from .values() rows (see core.views.FastListMixin).
 
     Actions:
         list: List all orders.
         create: Create a new order.
+        batch_create: Create one order per given offer detail.
         partial_update: Partially update an existing order.
         destroy: Delete an existing order.
     """
@@ -35,14 +44,14 @@ class OrderViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         """
         Assign permissions based on action.
-        - create: customer permission
+        - create, batch_create: customer permission
         - partial_update: business permission
         - destroy: admin permission
 
         Checks: authentication -> object existence -> ownership.
         """
         permission_classes = [IsAuthenticated]
-        if self.action == 'create':
+        if self.action in ['create', 'batch_create']:
             permission_classes.append(IsCustomerUser)
         if self.action == 'partial_update':
             permission_classes.append(IsBusinessUser)
@@ -58,10 +67,22 @@ class OrderViewSet(viewsets.ModelViewSet):
             return OrderSerializer
         if self.action == 'create':
             return OrderCreateUpdateSerializer
+        if self.action == 'batch_create':
+            return OrderBatchCreateSerializer
         if self.action == 'partial_update':
             return OrderUpdateSerializer
         return OrderSerializer
 
+    @extend_schema(
+        parameters=SPARSE_FIELDSET_PARAMETERS,
+        responses={
+            200: OrderSerializer(many=True),
+            401: OpenApiResponse(description="User is unauthorized"),
+        }
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @extend_schema(
         responses={
             201: OrderCreateUpdateSerializer,
@@ -77,12 +98,34 @@ class OrderViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """
         Save order with current user and offer detail.
+
+        The detail is loaded together with its offer, so the serializer
+        neither looks it up again nor queries the offer for its owner.
         """
-        offer_detail_id = self.request.data.get('offer_detail_id')
-        offer_detail = get_object_or_404(OfferDetail, pk=offer_detail_id)
+        offer_detail_id = serializer.validated_data.get('offer_detail_id')
+        offer_detail = get_object_or_404(OfferDetail.objects.select_related('offer'), pk=offer_detail_id)
         serializer.save(customer_user=self.request.user,
                         offer_detail=offer_detail)
 
+    @extend_schema(
+        request=OrderBatchCreateSerializer,
+        responses={
+            201: OrderSerializer(many=True),
+            400: OpenApiResponse(description="Bad Request or unknown offer detail ids"),
+            401: OpenApiResponse(description="User is unauthorized"),
+            403: OpenApiResponse(description="User is no customer user"),
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch_create(self, request):
+        """
+        Creates one order per id in 'offer_detail_ids', all or none.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        orders = serializer.save()
+        return Response(OrderSerializer(orders, many=True).data, status=status.HTTP_201_CREATED)
+
     @extend_schema(exclude=True)
     def retrieve(self, request, *args, **kwargs):
         """
@@ -168,3 +211,77 @@ class CompletedOrderCountView(generics.ListAPIView):
         completed_order_count = Order.objects.filter(
             business_user=business_user, status='completed').count()
         return Response({'completed_order_count': completed_order_count})
+
+
+class OrderStatsView(APIView):
+    """
+    API endpoint to get the order counts per status of a business user.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=['Orders'],
+        description="Get the number of orders per status for one business user.",
+        responses={
+            200: OrderStatsSerializer,
+            401: OpenApiResponse(description="User is unauthorized"),
+            404: OpenApiResponse(description="Found no business-user with this ID"),
+        }
+    )
+    def get(self, request, business_user_id, *args, **kwargs):
+        """
+        Retrieve order counts for one business user.
+        """
+        stats = get_order_stats([business_user_id])
+        if business_user_id not in stats:
+            raise Http404("Found no business-user with this ID.")
+        return Response(self.serialize(business_user_id, stats[business_user_id]))
+
+    def serialize(self, business_user_id, counts):
+        return OrderStatsSerializer({'business_user_id': business_user_id, **counts}).data
+
+
+class OrderStatsBatchView(OrderStatsView):
+    """
+    API endpoint to get the order counts per status of a batch of business
+    users given as 'business_user_ids', computed in a single grouped query.
+    """
+    max_batch_size = 100
+
+    @extend_schema(
+        tags=['Orders'],
+        description="Get the number of orders per status for a comma-separated batch of "
+                    "'business_user_ids'. Ids that are not business users are left out.",
+        parameters=[
+            OpenApiParameter(
+                'business_user_ids', str, required=True,
+                description="Comma-separated business user ids."),
+        ],
+        responses={
+            200: OrderStatsSerializer(many=True),
+            400: OpenApiResponse(description="Bad Request"),
+            401: OpenApiResponse(description="User is unauthorized"),
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        """
+        Retrieve order counts for a batch of business users.
+        """
+        business_user_ids = self.get_business_user_ids(request)
+        stats = get_order_stats(business_user_ids)
+        return Response([self.serialize(pk, stats[pk]) for pk in business_user_ids if pk in stats])
+
+    def get_business_user_ids(self, request):
+        """
+        Parses the 'business_user_ids' query parameter into a list of unique ids.
+        """
+        raw_ids = request.query_params.get('business_user_ids', '')
+        try:
+            business_user_ids = list(dict.fromkeys(int(pk) for pk in raw_ids.split(',') if pk.strip()))
+        except ValueError:
+            raise ValidationError({'business_user_ids': "Expected a comma-separated list of ids."})
+        if not business_user_ids:
+            raise ValidationError({'business_user_ids': "This parameter is required."})
+        if len(business_user_ids) > self.max_batch_size:
+            raise ValidationError({'business_user_ids': f"At most {self.max_batch_size} ids are allowed."})
+        return business_user_ids
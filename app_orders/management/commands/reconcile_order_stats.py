@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from app_orders.stats import reconcile_completed_order_counts
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the completed order counters kept on the user profiles.
+
+    Usage:
+        python manage.py reconcile_order_stats
+    """
+    help = "Recomputes the completed order count of every profile from the orders table."
+
+    def handle(self, *args, **options):
+        count = reconcile_completed_order_counts()
+        self.stdout.write(self.style.SUCCESS(f"Completed order counts of {count} profiles reconciled."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_orders', '0002_alter_order_delivery_time_in_days_alter_order_price_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['business_user', 'status'], name='order_business_status_idx'),
+        ),
+    ]
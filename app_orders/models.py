@@ -1,14 +1,17 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from core.utils import TrackChangesMixin
 
-class Order(models.Model):
+
+class Order(TrackChangesMixin, models.Model):
     STATUS_CHOICES = [
         ('in_progress', 'In Progress'),
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled'),
     ]
+    tracked_fields = ('status', 'business_user_id')
 
     title = models.CharField(max_length=255)
     revisions = models.IntegerField(default=0, validators=[MinValueValidator(0), MaxValueValidator(99999)])
@@ -22,3 +25,38 @@ class Order(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # order counts per business user and status
+            models.Index(fields=['business_user', 'status'], name='order_business_status_idx'),
+        ]
+
+    @classmethod
+    def from_offer_detail(cls, offer_detail, customer_user):
+        """
+        Returns a new, unsaved in-progress order for the given offer detail.
+
+        Copies the detail's terms and takes the business user from the
+        detail's offer, which must be loaded (the owner itself need not be).
+        """
+        return cls(
+            title=offer_detail.title,
+            revisions=offer_detail.revisions,
+            delivery_time_in_days=offer_detail.delivery_time_in_days,
+            price=offer_detail.price,
+            features=offer_detail.features,
+            offer_type=offer_detail.offer_type,
+            customer_user=customer_user,
+            business_user_id=offer_detail.offer.user_id,
+            status='in_progress',
+        )
+
+    def save(self, *args, **kwargs):
+        # the order row and the completed order counter (post_save) commit together
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            return super().delete(*args, **kwargs)
@@ -0,0 +1,60 @@
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver, Signal
+
+from app_orders.models import Order
+from app_orders.stats import invalidate_order_stats, apply_completed_order_deltas
+
+# Sent with 'orders' (saved Order instances) after a bulk insert, which
+# bypasses post_save. Receivers run inside the inserting transaction.
+orders_bulk_created = Signal()
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_business_order_stats(sender, instance, **kwargs):
+    """
+    Drops the cached order statistics of the order's business user.
+    """
+    invalidate_order_stats([instance.business_user_id])
+
+
+@receiver(orders_bulk_created, sender=Order)
+def invalidate_bulk_order_stats(sender, orders, **kwargs):
+    """
+    Drops the cached order statistics of every business user in a bulk insert.
+    """
+    invalidate_order_stats({order.business_user_id for order in orders})
+
+
+@receiver(post_save, sender=Order)
+def count_saved_completed_order(sender, instance, created, **kwargs):
+    """
+    Moves the completed order counters by the change of the order's status.
+    """
+    deltas = Counter()
+    if not created and instance.get_loaded_value('status') == 'completed':
+        deltas[instance.get_loaded_value('business_user_id')] -= 1
+    if instance.status == 'completed':
+        deltas[instance.business_user_id] += 1
+    apply_completed_order_deltas(deltas)
+
+
+@receiver(post_delete, sender=Order)
+def count_deleted_completed_order(sender, instance, origin=None, **kwargs):
+    """
+    Uncounts a deleted completed order, unless its business user is being
+    deleted too (the profile goes with it).
+    """
+    business_user_id = instance.get_loaded_value('business_user_id', instance.business_user_id)
+    if isinstance(origin, User) and origin.pk == business_user_id:
+        return
+    if instance.get_loaded_value('status', instance.status) == 'completed':
+        apply_completed_order_deltas({business_user_id: -1})
+
+
+@receiver(orders_bulk_created, sender=Order)
+def count_bulk_created_completed_orders(sender, orders, **kwargs):
+    apply_completed_order_deltas(Counter(order.business_user_id for order in orders if order.status == 'completed'))
@@ -0,0 +1,92 @@
+"""
+Per-business order statistics: the number of orders in each status.
+
+Counts for any number of business users are computed in one grouped query
+and cached per business user for ORDER_STATS_CACHE_TIMEOUT seconds (0 turns
+caching off). Order signals drop the cached entry of the affected
+business user (see app_orders.signals).
+
+The number of completed orders is also kept as a counter on the business
+user's profile, which business listings filter and sort by.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from app_auth.models import UserProfile
+from app_orders.models import Order
+
+
+def order_stats_cache_key(business_user_id):
+    return f'order-stats:{business_user_id}'
+
+
+def order_stats_queryset(business_user_ids):
+    """
+    Returns one row per business profile with a count per order status.
+    """
+    status_counts = {
+        status: Count('user__orders_as_business', filter=Q(user__orders_as_business__status=status))
+        for status, _ in Order.STATUS_CHOICES
+    }
+    return UserProfile.objects.filter(
+        user_id__in=business_user_ids, type='business').values('user_id').annotate(**status_counts)
+
+
+def get_order_stats(business_user_ids):
+    """
+    Returns a dict mapping each given business user id to its order counts.
+
+    Each entry has one count per Order.STATUS_CHOICES value plus 'total'.
+    Ids that do not belong to a business profile are left out.
+    """
+    timeout = getattr(settings, 'ORDER_STATS_CACHE_TIMEOUT', 60)
+    stats = {}
+    if timeout:
+        cached = cache.get_many([order_stats_cache_key(pk) for pk in business_user_ids])
+        for pk in business_user_ids:
+            if order_stats_cache_key(pk) in cached:
+                stats[pk] = cached[order_stats_cache_key(pk)]
+
+    missing = [pk for pk in business_user_ids if pk not in stats]
+    if missing:
+        fresh = {}
+        for row in order_stats_queryset(missing):
+            pk = row.pop('user_id')
+            row['total'] = sum(row.values())
+            fresh[pk] = row
+        if timeout and fresh:
+            cache.set_many({order_stats_cache_key(pk): row for pk, row in fresh.items()}, timeout)
+        stats.update(fresh)
+    return stats
+
+
+def invalidate_order_stats(business_user_ids):
+    """
+    Drops the cached order statistics of the given business users once the
+    current transaction commits.
+    """
+    keys = [order_stats_cache_key(pk) for pk in set(business_user_ids)]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def apply_completed_order_deltas(deltas):
+    """
+    Adds the deltas of a dict mapping business user ids to changes of
+    their completed order count to the profile counters.
+    """
+    for business_user_id, delta in deltas.items():
+        if delta:
+            UserProfile.objects.filter(user_id=business_user_id).update(
+                completed_order_count=F('completed_order_count') + delta)
+
+
+def reconcile_completed_order_counts():
+    """
+    Recomputes the completed order counter of every profile and returns the number of profiles.
+    """
+    completed = Order.objects.filter(business_user_id=OuterRef('user_id'), status='completed').order_by().values(
+        'business_user_id').annotate(count=Count('id')).values('count')
+    return UserProfile.objects.update(completed_order_count=Coalesce(Subquery(completed), Value(0)))
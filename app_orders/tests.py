@@ -1,3 +1,161 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from app_auth.models import UserProfile
+from app_offers.models import Offer, OfferDetail
+from app_orders.api.views import OrderViewSet
+from app_orders.models import Order
+
+
+class OrderStatsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create(username='customer')
+        UserProfile.objects.create(user=self.customer, type='customer')
+        self.businesses = []
+        for i in range(2):
+            business = User.objects.create(username=f'business{i}')
+            UserProfile.objects.create(user=business, type='business')
+            self.businesses.append(business)
+        for business, statuses in zip(self.businesses, [['in_progress', 'completed', 'completed'], ['cancelled']]):
+            for order_status in statuses:
+                self.create_order(business, order_status)
+        self.client.force_authenticate(self.customer)
+
+    def create_order(self, business, order_status):
+        return Order.objects.create(title='Order', customer_user=self.customer, business_user=business, status=order_status)
+
+    def test_single_business_user(self):
+        business = self.businesses[0]
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('order-stats', args=[business.id]))
+        self.assertEqual(response.data, {
+            'business_user_id': business.id, 'in_progress': 1, 'completed': 2, 'cancelled': 0, 'total': 3})
+
+        response = self.client.get(reverse('order-stats', args=[self.customer.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_batch_in_one_query(self):
+        ids = [business.id for business in reversed(self.businesses)] + [self.customer.id]
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('order-stats-batch'), {'business_user_ids': ','.join(map(str, ids))})
+        self.assertEqual([item['business_user_id'] for item in response.data], ids[:2])
+        self.assertEqual([item['total'] for item in response.data], [1, 3])
+
+        response = self.client.get(reverse('order-stats-batch'), {'business_user_ids': 'a,b'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_schema_declares_single_and_batch_responses(self):
+        paths = SchemaGenerator().get_schema(public=True)['paths']
+        single = paths['/api/order-stats/{business_user_id}/']['get']['responses']['200']
+        batch = paths['/api/order-stats/']['get']['responses']['200']
+        self.assertEqual(single['content']['application/json']['schema'], {'$ref': '#/components/schemas/OrderStats'})
+        self.assertEqual(batch['content']['application/json']['schema']['type'], 'array')
+
+    def test_cached_stats_are_invalidated_by_order_writes(self):
+        business = self.businesses[1]
+        url = reverse('order-stats', args=[business.id])
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_order(business, 'in_progress')
+        self.assertEqual(self.client.get(url).data['in_progress'], 1)
+
+
+class OrderCreateTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create(username='customer')
+        UserProfile.objects.create(user=self.customer, type='customer')
+        self.details = []
+        for i in range(2):
+            business = User.objects.create(username=f'business{i}')
+            UserProfile.objects.create(user=business, type='business')
+            offer = Offer.objects.create(user=business, title='Offer', description='Offer')
+            self.details.append(OfferDetail.objects.create(
+                offer=offer, title=f'Detail {i}', price=100 * (i + 1), delivery_time_in_days=3, offer_type='basic'))
+        self.client.force_authenticate(self.customer)
+
+    def test_single_order_loads_offer_detail_once(self):
+        detail = self.details[0]
+        # offer detail with its offer, insert
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('orders-list'), {'offer_detail_id': detail.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['business_user'], detail.offer.user_id)
+
+    def test_batch_creates_orders_in_bulk(self):
+        ids = [self.details[1].id, self.details[0].id, self.details[1].id]
+        # offer details with their offers, bulk insert (plus savepoint)
+        with self.assertNumQueries(4), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('orders-batch-create'), {'offer_detail_ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([order['price'] for order in response.data], [200, 100, 200])
+        self.assertEqual(Order.objects.filter(customer_user=self.customer).count(), 3)
+
+        business_id = self.details[1].offer.user_id
+        stats = self.client.get(reverse('order-stats', args=[business_id])).data
+        self.assertEqual(stats['in_progress'], 2)
+
+    def test_batch_with_unknown_id_creates_nothing(self):
+        response = self.client.post(
+            reverse('orders-batch-create'), {'offer_detail_ids': [self.details[0].id, 999]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('999', str(response.data['offer_detail_ids']))
+        self.assertFalse(Order.objects.exists())
+
+
+class OrderSparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.customer = User.objects.create(username='customer')
+        self.business = User.objects.create(username='business')
+        Order.objects.create(title='Order', customer_user=self.customer, business_user=self.business,
+                             status='in_progress', features=['Logo'])
+        self.client.force_authenticate(self.customer)
+
+    def test_omit_skips_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('orders-list'), {'omit': 'features,title', 'fields': 'id,title,status,features'})
+        self.assertEqual(response.data[0], {'id': response.data[0]['id'], 'status': 'in_progress'})
+        self.assertNotIn('"features"', queries[0]['sql'])
+
+    def test_write_requests_keep_all_fields(self):
+        order = Order.objects.get()
+        business_client = self.client_class()
+        UserProfile.objects.create(user=self.business, type='business')
+        business_client.force_authenticate(self.business)
+        response = business_client.patch(
+            reverse('orders-detail', args=[order.pk]) + '?fields=id', {'status': 'completed'}, format='json')
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertIn('features', response.data)
+
+
+class OrderFastListParityTests(APITestCase):
+    def setUp(self):
+        customer = User.objects.create(username='customer')
+        business = User.objects.create(username='business')
+        for order_status, features in [('in_progress', ['Logo', 'Icons']), ('completed', []), ('cancelled', ['Ünicode'])]:
+            Order.objects.create(title=f'Order {order_status}', customer_user=customer, business_user=business,
+                                 status=order_status, features=features, price=120, revisions=2)
+        self.client.force_authenticate(customer)
+
+    def get_content(self, fast_list, params):
+        with mock.patch.object(OrderViewSet, 'fast_list', fast_list):
+            response = self.client.get(reverse('orders-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.content
+
+    def test_fast_list_matches_serializer_output(self):
+        for params in [{}, {'fields': 'id,status,features'}, {'omit': 'created_at'}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.get_content(True, params), self.get_content(False, params))
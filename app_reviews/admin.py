@@ -1,4 +1,5 @@
 from django.contrib import admin
-from .models import Review
+from .models import Review, BusinessReviewStats
 
-admin.site.register(Review)
\ No newline at end of file
+admin.site.register(Review)
+admin.site.register(BusinessReviewStats)
@@ -1,10 +1,11 @@
 from rest_framework import serializers
 
-from ..models import Review
+from ..models import Review, BusinessReviewStats
+from core.serializers import SparseFieldsetMixin
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
-    Serializer for viewing review details.
+    Serializer for viewing review details. Supports '?fields=' and '?omit='.
     """
     class Meta:
         model = Review
@@ -17,4 +18,18 @@ class ReviewCreateUpdateSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = Review
-        fields = ['business_user', 'rating', 'description']
\ No newline at end of file
+        fields = ['business_user', 'rating', 'description']
+
+
+class BusinessReviewStatsSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the review aggregate of one business user.
+    """
+    business_user_id = serializers.IntegerField(read_only=True)
+    average_rating = serializers.DecimalField(read_only=True, max_digits=2, decimal_places=1, coerce_to_string=False, help_text="Average rating of the business user's reviews.")
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True, help_text="Number of reviews per rating, keyed '1' to '5'.")
+
+    class Meta:
+        model = BusinessReviewStats
+        fields = ['business_user_id', 'review_count', 'average_rating', 'rating_histogram']
+        read_only_fields = fields
@@ -3,6 +3,7 @@ URL configuration for review-related endpoints.
 
 Defines RESTful routes for:
 - Managing reviews through a viewset.
+- Retrieving the review summary (count, average, histogram) of a business user.
 
 Conventions:
 - Uses a router for automatic route generation.
@@ -11,18 +12,20 @@ Conventions:
 Example usage (reverse):
     reverse('reviews-list')
     reverse('reviews-detail', args=[1])
+    reverse('review-summary', args=[1])
 """
 
 from django.urls import path, include
 
 from rest_framework.routers import DefaultRouter
 
-from .views import ReviewViewSet
+from .views import ReviewViewSet, ReviewSummaryView
 
 
 router = DefaultRouter()
 router.register(r'reviews', ReviewViewSet, basename='reviews')
 
 urlpatterns = [
+    path('review-summary/<int:business_user_id>/', ReviewSummaryView.as_view(), name='review-summary'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
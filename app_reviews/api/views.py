@@ -1,26 +1,31 @@
 from django_filters.rest_framework import DjangoFilterBackend
 
-from rest_framework import viewsets, status, filters
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, viewsets, status, filters
 from rest_framework.exceptions import ValidationError, MethodNotAllowed
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 
-from ..models import Review
-from .serializers import ReviewSerializer, ReviewCreateUpdateSerializer
+from ..models import Review, BusinessReviewStats
+from .serializers import ReviewSerializer, ReviewCreateUpdateSerializer, BusinessReviewStatsSerializer
 from .permissions import IsReviewer
 from .filters import ReviewFilter
+from app_auth.models import UserProfile
 from app_orders.api.permissions import IsCustomerUser
+from core.serializers import SPARSE_FIELDSET_PARAMETERS
+from core.views import SparseFieldsetViewMixin, FastListMixin
 
 
 @extend_schema(
     tags=['Reviews'],
     description="API endpoint for managing orders.",
 )
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(SparseFieldsetViewMixin, FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet for viewing, creating, updating, and deleting review instances.
     Provides filtering, ordering, and permission checks for review-related actions.
+    Lists are serialized from .values() rows (see core.views.FastListMixin).
     """
     queryset = Review.objects.all()
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
@@ -49,6 +54,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return [perm() for perm in permission_classes]
 
     @extend_schema(
+        parameters=SPARSE_FIELDSET_PARAMETERS,
         responses={
             200: ReviewSerializer(many=True),
             401: OpenApiResponse(description="User is unauthorized"),
@@ -141,3 +147,33 @@ class ReviewViewSet(viewsets.ModelViewSet):
     )
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
+
+
+class ReviewSummaryView(generics.RetrieveAPIView):
+    """
+    API endpoint to get the review count, average rating and rating
+    histogram of a business user.
+
+    The numbers come from the incrementally maintained BusinessReviewStats
+    row, loaded together with the business profile in one query.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = BusinessReviewStatsSerializer
+
+    @extend_schema(
+        tags=['Reviews'],
+        description="Get the review count, average rating and rating histogram of a business user.",
+        responses={
+            200: BusinessReviewStatsSerializer,
+            401: OpenApiResponse(description="User is unauthorized"),
+            404: OpenApiResponse(description="Found no business-user with this ID"),
+        }
+    )
+    def get(self, request, business_user_id, *args, **kwargs):
+        """
+        Retrieve the review summary of a business user.
+        """
+        user_profile = get_object_or_404(
+            UserProfile.objects.select_related('user__review_stats'), user_id=business_user_id, type='business')
+        serializer = self.get_serializer(BusinessReviewStats.for_user(user_profile.user))
+        return Response(serializer.data)
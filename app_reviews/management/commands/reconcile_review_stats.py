@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from app_reviews.models import BusinessReviewStats
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the per-business review stats served by /api/review-summary/
+    and copies review count and average rating to the profiles.
+
+    Usage:
+        python manage.py reconcile_review_stats
+    """
+    help = "Recomputes the review count, rating sum and histogram of every business user from the reviews table."
+
+    def handle(self, *args, **options):
+        count = BusinessReviewStats.reconcile()
+        self.stdout.write(self.style.SUCCESS(f"Review stats of {count} business users reconciled."))
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_review_stats(apps, schema_editor):
+    Review = apps.get_model('app_reviews', 'Review')
+    BusinessReviewStats = apps.get_model('app_reviews', 'BusinessReviewStats')
+    rows = Review.objects.values('business_user_id').annotate(
+        review_count=Count('id'),
+        rating_sum=Sum('rating'),
+        **{f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating in range(1, 6)},
+    )
+    BusinessReviewStats.objects.bulk_create([
+        BusinessReviewStats(average_rating=row['rating_sum'] / row['review_count'], **row) for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_reviews', '0002_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessReviewStats',
+            fields=[
+                ('business_user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('average_rating', models.FloatField(default=0.0)),
+                ('rating_1', models.IntegerField(default=0)),
+                ('rating_2', models.IntegerField(default=0)),
+                ('rating_3', models.IntegerField(default=0)),
+                ('rating_4', models.IntegerField(default=0)),
+                ('rating_5', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'business review stats',
+                'indexes': [models.Index(fields=['average_rating'], name='review_stats_average_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_review_stats, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, FloatField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
 
+from app_auth.models import UserProfile
+from core.utils import TrackChangesMixin
 
-class Review(models.Model):
+
+class Review(TrackChangesMixin, models.Model):
     """
     Model representing a review/rating given by a customer to a business user.
 
@@ -13,6 +18,7 @@ class Review(models.Model):
     """
 
     RATING_CHOICES = [(i, i) for i in range(1, 6)]
+    tracked_fields = ('rating', 'business_user_id')
 
     business_user = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='reviews')
     reviewer = models.ForeignKey('auth.User', related_name='written_reviews', on_delete=models.CASCADE)
@@ -22,4 +28,134 @@ class Review(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        unique_together = ('business_user', 'reviewer')
\ No newline at end of file
+        unique_together = ('business_user', 'reviewer')
+        indexes = [
+            # ?business_user_id= / ?reviewer_id= combined with ?ordering=updated_at|rating
+            models.Index(fields=['business_user', 'updated_at'], name='review_business_updated_idx'),
+            models.Index(fields=['business_user', 'rating'], name='review_business_rating_idx'),
+            models.Index(fields=['reviewer', 'updated_at'], name='review_reviewer_updated_idx'),
+            models.Index(fields=['reviewer', 'rating'], name='review_reviewer_rating_idx'),
+            # unfiltered ?ordering=updated_at|rating
+            models.Index(fields=['updated_at'], name='review_updated_idx'),
+            models.Index(fields=['rating'], name='review_rating_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # the review row and the BusinessReviewStats update (post_save) commit together
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            return super().delete(*args, **kwargs)
+
+
+class BusinessReviewStats(models.Model):
+    """
+    Review aggregate of one business user: count, rating sum and a 1-5 histogram.
+
+    The row is updated incrementally by the Review signals (see
+    app_reviews.signals) in the transaction of the review write. Count and
+    average are copied to the business user's profile, whose indexes let
+    business listings filter and sort by them.
+    Drift caused by writes that bypass signals is fixed with the
+    'reconcile_review_stats' command.
+    """
+    business_user = models.OneToOneField(
+        'auth.User', on_delete=models.CASCADE, primary_key=True, related_name='review_stats')
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    average_rating = models.FloatField(default=0.0)
+    rating_1 = models.IntegerField(default=0)
+    rating_2 = models.IntegerField(default=0)
+    rating_3 = models.IntegerField(default=0)
+    rating_4 = models.IntegerField(default=0)
+    rating_5 = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'business review stats'
+        indexes = [
+            models.Index(fields=['average_rating'], name='review_stats_average_idx'),
+        ]
+
+    def __str__(self):
+        return f"Review stats of user {self.business_user_id}"
+
+    @property
+    def rating_histogram(self):
+        return {str(rating): getattr(self, f'rating_{rating}') for rating, _ in Review.RATING_CHOICES}
+
+    @classmethod
+    def for_user(cls, user):
+        """
+        Returns the stats of a user, or empty unsaved stats if the user has no reviews.
+        """
+        try:
+            return user.review_stats
+        except cls.DoesNotExist:
+            return cls(business_user=user)
+
+    @classmethod
+    def apply_review(cls, business_user_id, added=None, removed=None):
+        """
+        Adds the rating 'added' and/or removes the rating 'removed' in a single UPDATE.
+
+        Creates the row from the reviews table if it does not exist yet.
+        """
+        count_delta = (added is not None) - (removed is not None)
+        sum_delta = (added or 0) - (removed or 0)
+        changes = {
+            'review_count': F('review_count') + count_delta,
+            'rating_sum': F('rating_sum') + sum_delta,
+            'average_rating': Coalesce(
+                Cast(F('rating_sum') + sum_delta, FloatField()) / NullIf(F('review_count') + count_delta, 0),
+                Value(0.0)),
+        }
+        if added != removed:
+            for rating, delta in [(added, 1), (removed, -1)]:
+                if rating is not None:
+                    changes[f'rating_{rating}'] = F(f'rating_{rating}') + delta
+        if cls.objects.filter(business_user_id=business_user_id).update(**changes):
+            cls.copy_to_profiles([business_user_id])
+        else:
+            cls.reconcile([business_user_id])
+
+    @classmethod
+    def copy_to_profiles(cls, business_user_ids=None):
+        """
+        Copies review count and average to the profiles of the given users (all by default).
+        """
+        stats = cls.objects.filter(business_user_id=OuterRef('user_id'))
+        profiles = UserProfile.objects.all()
+        if business_user_ids is not None:
+            profiles = profiles.filter(user_id__in=business_user_ids)
+        profiles.update(
+            review_count=Coalesce(Subquery(stats.values('review_count')), Value(0)),
+            average_rating=Coalesce(Subquery(stats.values('average_rating')), Value(0.0)),
+        )
+
+    @classmethod
+    def reconcile(cls, business_user_ids=None):
+        """
+        Recomputes the stats of the given business users (all reviewed users
+        by default) from the reviews table and returns the number of rows written.
+        """
+        reviews = Review.objects.all()
+        if business_user_ids is not None:
+            reviews = reviews.filter(business_user_id__in=business_user_ids)
+        rows = reviews.values('business_user_id').annotate(
+            review_count=Count('id'),
+            rating_sum=Sum('rating'),
+            **{f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating, _ in Review.RATING_CHOICES},
+        )
+        stats = [cls(average_rating=row['rating_sum'] / row['review_count'], **row) for row in rows]
+        stale = cls.objects.exclude(business_user_id__in=[row.business_user_id for row in stats])
+        if business_user_ids is not None:
+            stale = stale.filter(business_user_id__in=business_user_ids)
+        stale.delete()
+        update_fields = ['review_count', 'rating_sum', 'average_rating'] + [
+            f'rating_{rating}' for rating, _ in Review.RATING_CHOICES]
+        cls.objects.bulk_create(
+            stats, update_conflicts=True, unique_fields=['business_user'], update_fields=update_fields)
+        cls.copy_to_profiles(business_user_ids)
+        return len(stats)
@@ -0,0 +1,35 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from app_reviews.models import Review, BusinessReviewStats
+
+
+@receiver(post_save, sender=Review)
+def update_saved_review_stats(sender, instance, created, **kwargs):
+    """
+    Adds a new review to its business user's stats, or moves an edited one.
+    """
+    if created:
+        BusinessReviewStats.apply_review(instance.business_user_id, added=instance.rating)
+        return
+    old_rating = instance.get_loaded_value('rating', instance.rating)
+    old_business_user_id = instance.get_loaded_value('business_user_id', instance.business_user_id)
+    if old_business_user_id != instance.business_user_id:
+        BusinessReviewStats.apply_review(old_business_user_id, removed=old_rating)
+        BusinessReviewStats.apply_review(instance.business_user_id, added=instance.rating)
+    elif old_rating != instance.rating:
+        BusinessReviewStats.apply_review(instance.business_user_id, added=instance.rating, removed=old_rating)
+
+
+@receiver(post_delete, sender=Review)
+def update_deleted_review_stats(sender, instance, origin=None, **kwargs):
+    """
+    Removes a deleted review from the stats, unless its business user is being
+    deleted too (the stats row goes with it).
+    """
+    if isinstance(origin, User) and origin.pk == instance.business_user_id:
+        return
+    old_rating = instance.get_loaded_value('rating', instance.rating)
+    old_business_user_id = instance.get_loaded_value('business_user_id', instance.business_user_id)
+    BusinessReviewStats.apply_review(old_business_user_id, removed=old_rating)
@@ -1,3 +1,87 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from app_auth.models import UserProfile
+from app_reviews.api.views import ReviewViewSet
+from app_reviews.models import Review, BusinessReviewStats
+
+
+class BusinessReviewStatsTests(APITestCase):
+    def setUp(self):
+        self.business = User.objects.create(username='business')
+        UserProfile.objects.create(user=self.business, type='business')
+        self.customers = [User.objects.create(username=f'customer{i}') for i in range(3)]
+        self.client.force_authenticate(self.customers[0])
+        self.url = reverse('review-summary', args=[self.business.pk])
+
+    def get_summary(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_stats_follow_review_writes(self):
+        self.assertEqual(self.get_summary()['review_count'], 0)
+        first = Review.objects.create(business_user=self.business, reviewer=self.customers[0], rating=5)
+        Review.objects.create(business_user=self.business, reviewer=self.customers[1], rating=2)
+        self.assertEqual(self.get_summary(), {
+            'business_user_id': self.business.pk, 'review_count': 2, 'average_rating': 3.5,
+            'rating_histogram': {'1': 0, '2': 1, '3': 0, '4': 0, '5': 1}})
+
+        first = Review.objects.get(pk=first.pk)
+        first.rating = 4
+        first.save()
+        summary = self.get_summary()
+        self.assertEqual(summary['average_rating'], 3.0)
+        self.assertEqual(summary['rating_histogram'], {'1': 0, '2': 1, '3': 0, '4': 1, '5': 0})
+
+        first.delete()
+        self.customers[1].delete()
+        summary = self.get_summary()
+        self.assertEqual((summary['review_count'], summary['average_rating']), (0, 0.0))
+
+    def test_business_list_reads_stats_without_scanning_reviews(self):
+        Review.objects.create(business_user=self.business, reviewer=self.customers[1], rating=4)
+        other = User.objects.create(username='other')
+        UserProfile.objects.create(user=other, type='business')
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('business-user-list'))
+        ratings = {row['user']: (row['review_count'], row['average_rating']) for row in response.data['results']}
+        self.assertEqual(ratings, {self.business.pk: (1, 4.0), other.pk: (0, 0.0)})
+
+    def test_reconcile_fixes_drift(self):
+        Review.objects.create(business_user=self.business, reviewer=self.customers[1], rating=3)
+        BusinessReviewStats.objects.update(review_count=9, rating_4=2)
+        BusinessReviewStats.reconcile()
+        summary = self.get_summary()
+        self.assertEqual(summary['review_count'], 1)
+        self.assertEqual(summary['rating_histogram']['4'], 0)
+
+    def test_deleting_the_business_user_drops_its_stats(self):
+        Review.objects.create(business_user=self.business, reviewer=self.customers[1], rating=3)
+        self.business.delete()
+        self.assertFalse(BusinessReviewStats.objects.exists())
+
+
+class ReviewFastListParityTests(APITestCase):
+    def setUp(self):
+        business = User.objects.create(username='business')
+        for i, rating in enumerate([5, 3, 4]):
+            self.reviewer = User.objects.create(username=f'customer{i}')
+            Review.objects.create(business_user=business, reviewer=self.reviewer, rating=rating, description=f'Review {i}')
+        self.client.force_authenticate(self.reviewer)
+
+    def get_content(self, fast_list, params):
+        with mock.patch.object(ReviewViewSet, 'fast_list', fast_list):
+            response = self.client.get(reverse('reviews-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.content
+
+    def test_fast_list_matches_serializer_output(self):
+        for params in [{}, {'ordering': '-rating'}, {'reviewer_id': self.reviewer.pk}, {'fields': 'rating,reviewer'}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.get_content(True, params), self.get_content(False, params))
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.checks import Tags, Warning, register
+
+
+def get_version_cache():
+    """
+    Returns the cache holding the version stamps (CACHE_VERSION_ALIAS).
+    """
+    return caches[settings.CACHE_VERSION_ALIAS]
+
+
+def get_cache_version(name):
+    """
+    Returns the current version stamp for the named group of cache entries.
+
+    Cache keys that embed this stamp are invalidated all at once by
+    bump_cache_version(). The stamp is the time of the last bump, so it
+    doubles as a last-modified timestamp. Stamps live in the cache named by
+    CACHE_VERSION_ALIAS, which must be shared by all worker processes for a
+    bump to reach every one of them (see check_version_cache).
+    """
+    version_cache = get_version_cache()
+    key = f'version:{name}'
+    version = version_cache.get(key)
+    if version is None:
+        version_cache.add(key, time.time(), None)
+        version = version_cache.get(key)
+    return version
+
+
+def bump_cache_version(name):
+    """
+    Invalidates every cache entry built with the named version stamp.
+    """
+    get_version_cache().set(f'version:{name}', time.time(), None)
+
+
+@register(Tags.caches, deploy=True)
+def check_version_cache(app_configs, **kwargs):
+    """
+    Warns on deploy checks if the version stamps are kept in per-process memory.
+    """
+    backend = settings.CACHES.get(settings.CACHE_VERSION_ALIAS, {}).get('BACKEND', '')
+    if backend.endswith(('.LocMemCache', '.DummyCache')):
+        return [Warning(
+            f"CACHE_VERSION_ALIAS '{settings.CACHE_VERSION_ALIAS}' uses {backend.rsplit('.', 1)[-1]}, "
+            f"which is not shared between processes.",
+            hint="With more than one worker process, cached responses are not invalidated across workers. "
+                 "Point CACHE_VERSION_ALIAS at a shared cache such as Redis or Memcached.",
+            id='core.W001',
+        )]
+    return []
+
+
+def count_version_name(model):
+    """
+    Returns the version name used for cached row counts of a model.
+    """
+    return f'count:{model._meta.label_lower}'
+
+
+class LRUCache:
+    """
+    Thread-safe in-process cache with a maximum size and a time to live.
+
+    Holds at most 'maxsize' entries, evicting the least recently used one
+    first; entries older than 'timeout' seconds are treated as missing.
+    Entries live in the memory of one process only, so changes made by
+    other processes become visible after 'timeout' seconds at the latest.
+    """
+    def __init__(self, maxsize=1024, timeout=60):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if not self.timeout or not self.maxsize:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_matching(self, predicate):
+        """
+        Deletes every entry whose value satisfies predicate(value).
+        """
+        with self._lock:
+            for key in [key for key, (_, value) in self._entries.items() if predicate(value)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TieredCache:
+    """
+    Read-through pair of an in-process LRUCache and an optional shared cache.
+
+    Reads try the local LRU first, then the shared cache (copying hits into
+    the LRU); writes go to both. 'shared_alias' names an entry of CACHES,
+    None keeps entries in process memory only.
+    """
+    def __init__(self, maxsize=1024, timeout=60, shared_alias=None):
+        self.local = LRUCache(maxsize=maxsize, timeout=timeout)
+        self.timeout = timeout
+        self.shared_alias = shared_alias
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias] if self.shared_alias else None
+
+    def get(self, key, default=None):
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return default if value is None else value
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value, self.timeout)
+
+    def clear(self):
+        self.local.clear()
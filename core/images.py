@@ -0,0 +1,164 @@
+"""
+Fixed-size, content-hashed derivatives (thumbnails) of uploaded images.
+
+After an upload is committed, a background task (see core.tasks) renders
+one WebP file per entry of IMAGE_DERIVATIVE_SIZES next to the original,
+e.g. 'offers/3f/derivatives/3f2a...9c.card.7e4d1b9a0c2f.webp', and stores the
+names in the model's derivatives JSON field. The hash in the name changes
+with the content, so derivatives can be served with far-future cache
+headers. Uploads that are no images (or a missing Pillow) get no derivatives.
+Usage: register_image_derivatives(Offer, 'image', 'image_derivatives')
+"""
+import hashlib
+import io
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import Signal
+from drf_spectacular.utils import extend_schema_field
+from rest_framework import serializers
+
+from core.tasks import run_in_background
+from core.utils import queue_file_deletion, delete_unreferenced_files
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:  # Pillow is optional; without it no derivatives are made
+    Image = None
+
+# Sent with 'pk' after the derivatives of an instance were stored (with a
+# queryset update, which sends no post_save).
+derivatives_updated = Signal()
+
+DEFAULT_DERIVATIVE_SIZES = {
+    'thumbnail': (160, 160),
+    'card': (480, 320),
+}
+
+
+def get_derivative_sizes():
+    return getattr(settings, 'IMAGE_DERIVATIVE_SIZES', DEFAULT_DERIVATIVE_SIZES)
+
+
+def render_derivative(image, size):
+    """
+    Returns the WebP bytes of the image cropped and scaled to exactly 'size'.
+    """
+    derivative = ImageOps.fit(image, size, method=Image.Resampling.LANCZOS)
+    if derivative.mode not in ('RGB', 'RGBA'):
+        derivative = derivative.convert('RGBA' if 'A' in derivative.getbands() else 'RGB')
+    output = io.BytesIO()
+    derivative.save(output, format='WEBP', quality=80, method=4)
+    return output.getvalue()
+
+
+def generate_derivatives(storage, name):
+    """
+    Renders and saves the derivatives of the stored image 'name'.
+
+    Returns a dict mapping each size name to the saved file name, or an
+    empty dict if the file cannot be read as an image.
+    """
+    if Image is None:
+        return {}
+    try:
+        with storage.open(name, 'rb') as source:
+            image = ImageOps.exif_transpose(Image.open(source))
+            image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return {}
+
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    derivatives = {}
+    for size_name, size in get_derivative_sizes().items():
+        content = render_derivative(image, tuple(size))
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        derivative_name = posixpath.join(directory, 'derivatives', f'{stem}.{size_name}.{digest}.webp')
+        if not storage.exists(derivative_name):
+            derivative_name = storage.save(derivative_name, ContentFile(content))
+        derivatives[size_name] = derivative_name
+    return derivatives
+
+
+def build_derivatives(model, pk, field_name, derivatives_field, name):
+    """
+    Background task: renders the derivatives of an instance's file and stores their names.
+
+    The names are only stored if the instance still holds the same file;
+    otherwise the derivatives are discarded again, unless another row
+    shares the file (and with it the derivatives).
+    """
+    storage = model._meta.get_field(field_name).storage
+    derivatives = generate_derivatives(storage, name)
+    if not derivatives:
+        return
+    updated = model.objects.filter(pk=pk, **{field_name: name}).update(**{derivatives_field: derivatives})
+    if updated:
+        derivatives_updated.send(sender=model, pk=pk)
+    else:
+        delete_unreferenced_files(model, field_name, name, derivatives.values())
+
+
+def register_image_derivatives(model, field_name, derivatives_field):
+    """
+    Connects the signal receivers that keep a model's image derivatives in
+    sync with its file field.
+
+    The model must track the file field (see core.utils.TrackChangesMixin).
+    """
+    uid = f'image_derivatives:{model._meta.label}.{field_name}'
+
+    def reset_changed_derivatives(sender, instance, raw=False, using='default', **kwargs):
+        instance._derivatives_outdated = not raw and (
+            instance.has_field_changed(field_name) or (instance._state.adding and bool(getattr(instance, field_name))))
+        if instance._derivatives_outdated and getattr(instance, derivatives_field):
+            old_name = instance.get_loaded_value(field_name)
+            queue_file_deletion(sender, field_name, old_name, getattr(instance, derivatives_field).values(), using)
+            setattr(instance, derivatives_field, {})
+
+    def queue_derivatives(sender, instance, using='default', **kwargs):
+        name = getattr(instance, field_name).name
+        if getattr(instance, '_derivatives_outdated', False) and name:
+            instance._derivatives_outdated = False
+            transaction.on_commit(lambda: run_in_background(
+                build_derivatives, sender, instance.pk, field_name, derivatives_field, name), using=using)
+
+    def delete_derivatives(sender, instance, using='default', **kwargs):
+        name = getattr(instance, field_name).name
+        queue_file_deletion(sender, field_name, name, (getattr(instance, derivatives_field) or {}).values(), using)
+
+    pre_save.connect(reset_changed_derivatives, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(queue_derivatives, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(delete_derivatives, sender=model, weak=False, dispatch_uid=uid)
+
+
+@extend_schema_field({
+    'type': 'object',
+    'additionalProperties': {'type': 'string', 'format': 'uri'},
+    'example': {'thumbnail': 'http://localhost:8000/media/offers/3f/derivatives/3f2a9c.thumbnail.7e4d1b9a0c2f.webp'},
+})
+class DerivativeURLsField(serializers.ReadOnlyField):
+    """
+    Serializer field that turns a derivatives JSON field into absolute URLs.
+
+    Returns a dict mapping each size name to its URL; empty until the
+    derivatives have been rendered.
+    """
+    def __init__(self, storage_field, **kwargs):
+        self.storage_field = storage_field
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return {}
+        storage = self.parent.Meta.model._meta.get_field(self.storage_field).storage
+        request = self.context.get('request')
+        urls = {}
+        for size_name, name in value.items():
+            url = storage.url(name)
+            urls[size_name] = request.build_absolute_uri(url) if request else url
+        return urls
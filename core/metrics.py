@@ -0,0 +1,155 @@
+"""
+In-process request metrics, collected by core.middleware.RequestMetricsMiddleware.
+
+Metrics are aggregated per route (HTTP method and URL name) and kept in
+memory of the current worker process only; they reset when it restarts.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Each bucket counts observations up to and
+    including its upper bound; the last one counts everything above.
+    """
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self):
+        labels = [f'le_{bound}' for bound in self.buckets] + ['inf']
+        count = sum(self.counts)
+        return {
+            'count': count,
+            'sum': round(self.total, 3),
+            'avg': round(self.total / count, 3) if count else 0,
+            'max': round(self.max, 3),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class RouteMetrics:
+    """
+    Histograms of one route.
+    """
+    def __init__(self):
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_ms = Histogram(DURATION_BUCKETS_MS)
+        self.serialize_ms = Histogram(DURATION_BUCKETS_MS)
+        self.render_ms = Histogram(DURATION_BUCKETS_MS)
+        self.total_ms = Histogram(DURATION_BUCKETS_MS)
+
+    def as_dict(self):
+        return {
+            'requests': sum(self.total_ms.counts),
+            'queries': self.queries.as_dict(),
+            'db_ms': self.db_ms.as_dict(),
+            'serialize_ms': self.serialize_ms.as_dict(),
+            'render_ms': self.render_ms.as_dict(),
+            'total_ms': self.total_ms.as_dict(),
+        }
+
+
+_lock = threading.Lock()
+_routes = {}
+
+
+def record(route, queries, db_ms, serialize_ms, render_ms, total_ms):
+    """
+    Adds the measurements of one request to the metrics of its route.
+    """
+    with _lock:
+        metrics = _routes.get(route)
+        if metrics is None:
+            metrics = _routes[route] = RouteMetrics()
+        metrics.queries.observe(queries)
+        metrics.db_ms.observe(db_ms)
+        metrics.serialize_ms.observe(serialize_ms)
+        metrics.render_ms.observe(render_ms)
+        metrics.total_ms.observe(total_ms)
+
+
+class SerializationTimer:
+    """
+    Sums up the time spent in serializers. Nested calls (e.g. Serializer.data
+    calling BaseSerializer.data) are counted once, by the outermost call.
+    """
+    def __init__(self):
+        self.duration = 0.0
+        self.depth = 0
+
+    @contextmanager
+    def measure(self):
+        self.depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            if not self.depth:
+                self.duration += time.perf_counter() - start
+
+
+_serialization_timer = ContextVar('serialization_timer', default=None)
+
+
+@contextmanager
+def measure_serialization():
+    """
+    Yields a SerializationTimer that collects the time spent in functions
+    decorated with timed_serialization within the block.
+    """
+    timer = SerializationTimer()
+    token = _serialization_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _serialization_timer.reset(token)
+
+
+def timed_serialization(func):
+    """
+    Decorator that adds the duration of each call to the current
+    SerializationTimer, if any.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        timer = _serialization_timer.get()
+        if timer is None:
+            return func(*args, **kwargs)
+        with timer.measure():
+            return func(*args, **kwargs)
+
+    wrapper.timed_serialization = True
+    return wrapper
+
+
+def snapshot():
+    """
+    Returns the aggregated metrics of all routes as a dict.
+    """
+    with _lock:
+        return {route: metrics.as_dict() for route, metrics in sorted(_routes.items())}
+
+
+def reset():
+    """
+    Discards all collected metrics.
+    """
+    with _lock:
+        _routes.clear()
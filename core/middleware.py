@@ -0,0 +1,104 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import serializers
+
+from core import metrics
+
+
+class QueryTimer:
+    """
+    Database execute wrapper that counts queries and sums up their duration.
+    """
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def install_serialization_timing():
+    """
+    Wraps the 'data' properties of DRF's serializer classes with
+    core.metrics.timed_serialization, once per process.
+    """
+    for serializer_class in [serializers.BaseSerializer, serializers.Serializer, serializers.ListSerializer]:
+        data = serializer_class.__dict__['data']
+        if not getattr(data.fget, 'timed_serialization', False):
+            serializer_class.data = property(metrics.timed_serialization(data.fget), doc=data.__doc__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures query count, database time, serialization time, render time and
+    total latency of every request.
+
+    The values are sent back as a 'Server-Timing' header and aggregated per
+    route in core.metrics. Serialization time covers building serializer.data
+    and the fast list path (core.serializers.ValuesSerializer), including the
+    queries they run. Render time covers response.render() only (e.g. DRF's
+    JSON rendering). Streamed responses are not rendered, so their render
+    time is always 0 and their total ends when the view returns, before the
+    body is streamed. Disable with the REQUEST_METRICS_ENABLED setting.
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        install_serialization_timing()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        request._metrics_render_ms = 0.0
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            serialization = stack.enter_context(metrics.measure_serialization())
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = timer.duration * 1000
+        serialize_ms = serialization.duration * 1000
+        render_ms = request._metrics_render_ms
+
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.1f};desc="{timer.count} queries", '
+            f'serialize;dur={serialize_ms:.1f}, '
+            f'render;dur={render_ms:.1f}, '
+            f'total;dur={total_ms:.1f}'
+        )
+        route = self.get_route(request)
+        if route is not None:
+            metrics.record(route, timer.count, db_ms, serialize_ms, render_ms, total_ms)
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Starts the render timer right before the response gets rendered.
+        """
+        start = time.perf_counter()
+
+        def stop_timer(rendered_response):
+            request._metrics_render_ms = (time.perf_counter() - start) * 1000
+
+        response.add_post_render_callback(stop_timer)
+        return response
+
+    def get_route(self, request):
+        """
+        Returns the metrics key of the request, e.g. 'GET offers-list',
+        or None if no URL pattern matched.
+        """
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return None
+        return f'{request.method} {match.view_name or match.route}'
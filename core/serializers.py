@@ -0,0 +1,197 @@
+from django.core.exceptions import FieldDoesNotExist
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+
+from core.metrics import timed_serialization
+
+
+def parse_field_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def resolve_field_path(model, path):
+    """
+    Returns the relation part of a model field path ('user__username' ->
+    'user'), '' for a field of the model itself, or None if the path does
+    not end in a concrete field reachable through single-valued relations.
+    """
+    parts = path.split('__')
+    for position, part in enumerate(parts):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if field.many_to_many or field.one_to_many:
+            return None
+        if position == len(parts) - 1:
+            return '__'.join(parts[:-1]) if field.concrete else None
+        if not field.is_relation:
+            return None
+        model = field.related_model
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin for sparse fieldsets on read requests.
+
+    The comma-separated 'fields' query parameter keeps only the named
+    fields, 'omit' drops the named ones; unknown names are ignored. Only
+    serializers created with the request in their context are trimmed,
+    i.e. the serializer of the response and the children of a list, not
+    nested serializer fields. Write requests always get every field.
+
+    'selected_field_names' holds the kept names (None if untrimmed) and
+    get_model_field_paths() tells the view which columns they read (see
+    core.views.SparseFieldsetViewMixin). Fields whose source is not a
+    model field declare their paths in 'sparse_field_sources'.
+    Usage: class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer)
+    """
+    fields_param = 'fields'
+    omit_param = 'omit'
+    sparse_field_sources = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.selected_field_names = self.get_selected_field_names()
+        if self.selected_field_names is not None:
+            for name in set(self.fields) - self.selected_field_names:
+                self.fields.pop(name)
+
+    def get_selected_field_names(self):
+        """
+        Returns the names of the fields to keep, or None to keep all fields.
+        """
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        available = set(self.fields)
+        requested = parse_field_names(request.query_params.get(self.fields_param, '')) & available
+        omitted = parse_field_names(request.query_params.get(self.omit_param, '')) & available
+        if not requested and not omitted:
+            return None
+        return (requested or available) - omitted
+
+    def get_model_field_paths(self):
+        """
+        Returns the model field paths read by the serialized fields, or None
+        if a field reads something that cannot be resolved to model fields.
+        """
+        model = self.Meta.model
+        paths = set()
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if name in self.sparse_field_sources:
+                paths.update(self.sparse_field_sources[name])
+                continue
+            if field.source == '*':
+                return None
+            path = field.source.replace('.', '__')
+            if resolve_field_path(model, path) is None:
+                return None
+            paths.add(path)
+        return paths
+
+
+class ValuesSerializer:
+    """
+    Fast read path that turns .values() rows into exactly the dicts a
+    (possibly sparse) serializer would produce for the same objects.
+
+    Compiled once per request from a serializer instance: every readable
+    field becomes a (name, row key, converter) mapper, so serializing a
+    row is one dict lookup and at most one call per field, without model
+    instances, get_attribute() or field dispatch. Fields the compiler
+    cannot map (sources that are not model fields, nested serializers,
+    method fields) need a 'get_<name>_from_values(row)' method on the
+    serializer and their paths in 'sparse_field_sources'; an optional
+    'prepare_values(rows)' method runs once per page before that, e.g. to
+    load related rows. build() returns None if any field is unsupported.
+    """
+    def __init__(self, serializer):
+        self.serializer = serializer
+        model = serializer.Meta.model
+        self.paths = {model._meta.pk.name}
+        self.mappers = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            from_values = getattr(serializer, f'get_{name}_from_values', None)
+            if from_values is not None:
+                self.paths.update(serializer.sparse_field_sources.get(name, []))
+                self.mappers.append((name, None, from_values))
+                continue
+            if field.source == '*' or isinstance(field, serializers.BaseSerializer):
+                raise ValueError(f"Field '{name}' has no values mapping.")
+            path = field.source.replace('.', '__')
+            if resolve_field_path(model, path) is None:
+                raise ValueError(f"Field '{name}' does not read a model field.")
+            self.paths.add(path)
+            self.mappers.append((name, path, self.get_converter(model, path, field)))
+
+    @classmethod
+    def build(cls, serializer):
+        """
+        Returns the compiled serializer, or None if the fast path does not support it.
+        """
+        try:
+            return cls(serializer)
+        except ValueError:
+            return None
+
+    def get_converter(self, model, path, field):
+        """
+        Returns the function turning a non-null column value into the field's
+        representation, or None if the value is used as it is.
+        """
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+            return None
+        if isinstance(field, serializers.FileField):
+            if '__' in path:
+                raise ValueError(f"File field '{path}' of a related model is not supported.")
+            if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+                return lambda name: name or None
+            storage = model._meta.get_field(path).storage
+            request = self.serializer.context.get('request')
+
+            def file_url(name):
+                if not name:
+                    return None
+                url = storage.url(name)
+                return request.build_absolute_uri(url) if request is not None else url
+            return file_url
+        if type(field) is serializers.CharField:
+            return str
+        if type(field) is serializers.IntegerField:
+            return int
+        return field.to_representation
+
+    @timed_serialization
+    def serialize(self, rows):
+        rows = list(rows)
+        prepare_values = getattr(self.serializer, 'prepare_values', None)
+        if prepare_values is not None:
+            prepare_values(rows)
+        return [self.to_representation(row) for row in rows]
+
+    def to_representation(self, row):
+        ret = {}
+        for name, key, convert in self.mappers:
+            if key is None:
+                ret[name] = convert(row)
+                continue
+            value = row[key]
+            ret[name] = value if value is None or convert is None else convert(value)
+        return ret
+
+
+SPARSE_FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        'fields', str, required=False,
+        description="Comma-separated names of the fields to return (all fields if omitted)."),
+    OpenApiParameter(
+        'omit', str, required=False,
+        description="Comma-separated names of fields to leave out."),
+]
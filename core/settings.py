@@ -68,6 +68,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,6 +79,56 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-route query count and latency metrics (Server-Timing header and /api/metrics/)
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', 'True') == 'True'
+
+# Seconds to cache per-business order statistics (/api/order-stats/), 0 disables caching
+ORDER_STATS_CACHE_TIMEOUT = int(os.environ.get('ORDER_STATS_CACHE_TIMEOUT', 60))
+
+# Caches. CACHE_VERSION_ALIAS names the cache holding the version stamps that invalidate the cached
+# offer lists, offers and tokens (core.cache); with more than one worker process it must be shared by all
+# of them (e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache, CACHE_LOCATION=redis://...)
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    },
+}
+CACHE_VERSION_ALIAS = os.environ.get('CACHE_VERSION_ALIAS', 'default')
+
+# Seconds to cache list responses with ETag/conditional GET support (/api/offers/), 0 disables caching
+LIST_RESPONSE_CACHE_TIMEOUT = int(os.environ.get('LIST_RESPONSE_CACHE_TIMEOUT', 60))
+
+# Serialized offers and offer details kept per process (entries, seconds); OBJECT_CACHE_ALIAS
+# names an additional shared cache from CACHES. Entries are checked against the offer's version
+# stamp in the CACHE_VERSION_ALIAS cache on every read, so they are never served after a change
+OBJECT_CACHE_SIZE = int(os.environ.get('OBJECT_CACHE_SIZE', 2048))
+OBJECT_CACHE_TIMEOUT = int(os.environ.get('OBJECT_CACHE_TIMEOUT', 300))
+OBJECT_CACHE_ALIAS = os.environ.get('OBJECT_CACHE_ALIAS') or None
+
+# Authenticated tokens kept in memory per process (size, seconds), 0 disables caching. Entries are
+# checked against their user's version stamp in the CACHE_VERSION_ALIAS cache on every request,
+# so deleted tokens and changed users are rejected by every worker
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 1024))
+TOKEN_CACHE_TIMEOUT = int(os.environ.get('TOKEN_CACHE_TIMEOUT', 60))
+
+# Seconds to cache the profile type used by role permission checks, 0 disables caching
+PROFILE_TYPE_CACHE_TIMEOUT = int(os.environ.get('PROFILE_TYPE_CACHE_TIMEOUT', 60))
+
+# Deferred work such as file cleanup runs on a thread pool (core.tasks), False runs it inline
+BACKGROUND_TASKS_ENABLED = os.environ.get('BACKGROUND_TASKS_ENABLED', 'True') == 'True'
+BACKGROUND_TASK_WORKERS = int(os.environ.get('BACKGROUND_TASK_WORKERS', 2))
+
+# Uploads are streamed to temporary files and hashed (core.uploads); larger files are rejected with 413
+FILE_UPLOAD_HANDLERS = ['core.uploads.HashingTemporaryFileUploadHandler']
+FILE_UPLOAD_MAX_SIZE = int(os.environ.get('FILE_UPLOAD_MAX_SIZE', 10 * 1024 * 1024))
+
+# Resized versions (width, height) rendered for uploaded offer and profile images (core.images)
+IMAGE_DERIVATIVE_SIZES = {
+    'thumbnail': (160, 160),
+    'card': (480, 320),
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -154,7 +205,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'app_auth.api.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
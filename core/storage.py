@@ -0,0 +1,82 @@
+"""
+Content-addressed file fields.
+
+A ContentAddressedFileField stores each file under the SHA-256 of its
+content, e.g. 'offers/3f/3f2a...9c.png', so identical uploads share one
+stored file and re-uploading a file writes nothing. Because a stored file
+may be shared, files are only deleted once no row refers to them any more
+(see core.utils.delete_unreferenced_files), and an upload that reused a
+file deleted before it committed writes it again (restore_missing_file).
+"""
+import hashlib
+import os
+
+from django.db import models
+from django.db.models.fields.files import FieldFile
+
+
+def content_hash(content):
+    """
+    Returns the SHA-256 hex digest of a file, reusing the one computed during upload.
+    """
+    digest = getattr(content, 'content_hash', None)
+    if digest:
+        return digest
+    sha = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        sha.update(chunk)
+    content.seek(0)
+    return sha.hexdigest()
+
+
+def content_addressed_upload(instance, filename):
+    """
+    upload_to for content-addressed fields: '<model>s/<first two hash digits>/<hash><ext>'.
+    Usage: file = ContentAddressedFileField(upload_to=content_addressed_upload)
+    """
+    model_name = instance.__class__.__name__.lower()
+    return f"{model_name}s/{filename[:2]}/{filename}"
+
+
+class ContentAddressedFieldFile(FieldFile):
+    def save(self, name, content, save=True):
+        extension = os.path.splitext(name)[1].lower()
+        name = self.field.generate_filename(self.instance, f"{content_hash(content)}{extension}")
+        if self.storage.exists(name):
+            # The file may still be deleted by a row that dropped it before
+            # this one commits; restore_missing_file() writes it again then.
+            self.instance.__dict__.setdefault('_reused_file_contents', {})[self.field.name] = content
+        else:
+            name = self.storage.save(name, content, max_length=self.field.max_length)
+        self.name = name
+        self._set_instance_attribute(self.name, content)
+        self._committed = True
+
+        if save:
+            self.instance.save()
+
+    save.alters_data = True
+
+
+def restore_missing_file(instance, field_name):
+    """
+    Writes a file that save() found in storage again if it has been deleted since.
+
+    Covers an upload racing the deletion of the same content dropped by
+    another row: the deletion checks for references before this row is
+    committed. Called after commit (see core.utils.restore_reused_files).
+    """
+    content = instance.__dict__.get('_reused_file_contents', {}).pop(field_name, None)
+    field_file = getattr(instance, field_name)
+    if content is None or getattr(content, 'closed', False) or field_file.storage.exists(field_file.name):
+        return
+    content.seek(0)
+    field_file.storage.save(field_file.name, content, max_length=field_file.field.max_length)
+
+
+class ContentAddressedFileField(models.FileField):
+    """
+    FileField that names stored files after the SHA-256 of their content.
+    """
+    attr_class = ContentAddressedFieldFile
@@ -0,0 +1,50 @@
+"""
+In-process background execution for work that should not delay a response.
+
+Tasks run on a small thread pool owned by the process; pending tasks are
+finished when the process exits. Set BACKGROUND_TASKS_ENABLED to False to
+run tasks inline instead (useful in tests and management commands).
+"""
+import atexit
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Returns the process-wide executor, creating it on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BACKGROUND_TASK_WORKERS', 2), thread_name_prefix='background-task')
+            atexit.register(_executor.shutdown, wait=True)
+        return _executor
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Runs func(*args, **kwargs) on the background executor.
+
+    Exceptions are logged rather than raised, since nobody waits for the result.
+    """
+    if not getattr(settings, 'BACKGROUND_TASKS_ENABLED', True):
+        _run_logged(func, *args, **kwargs)
+        return
+    get_executor().submit(_run_logged, func, *args, **kwargs)
+
+
+def _run_logged(func, *args, **kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed.", getattr(func, '__name__', func))
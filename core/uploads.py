@@ -0,0 +1,66 @@
+"""
+Upload handling for multipart requests.
+
+HashingTemporaryFileUploadHandler replaces Django's default handlers (see
+FILE_UPLOAD_HANDLERS): every uploaded file is streamed to a temporary file
+in chunks while its SHA-256 is computed, so worker memory stays flat
+whatever the file size. Files larger than FILE_UPLOAD_MAX_SIZE are
+rejected while they are being received, or before anything is read if
+the request itself is too large to stay within the limit.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class UploadTooLarge(RequestDataTooBig, APIException):
+    """
+    Raised when an uploaded file exceeds FILE_UPLOAD_MAX_SIZE.
+
+    API views answer it with 413; other views treat it like any request
+    that is too big (400).
+    """
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "The uploaded file is too large."
+    default_code = 'upload_too_large'
+
+
+class HashingTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams uploads to temporary files, hashing them and enforcing the size limit.
+
+    The hex digest is set as 'content_hash' on each uploaded file, so
+    content-addressed fields do not need to read the file again.
+    """
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.max_size = getattr(settings, 'FILE_UPLOAD_MAX_SIZE', None)
+        # The form fields next to the file are bounded by DATA_UPLOAD_MAX_MEMORY_SIZE.
+        max_request_size = self.max_size and self.max_size + (settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0)
+        if max_request_size and content_length and content_length > max_request_size:
+            raise self.too_large()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hash = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.max_size and self.received > self.max_size:
+            self.upload_interrupted()
+            raise self.too_large()
+        self.hash.update(raw_data)
+        super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.content_hash = self.hash.hexdigest()
+        return file
+
+    def too_large(self):
+        return UploadTooLarge(f"Files may be at most {filesizeformat(self.max_size)}.")
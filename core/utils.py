@@ -1,43 +1,154 @@
 import os
-from django.core.files.storage import default_storage
-from django.dispatch import receiver
-from django.db.models.signals import pre_save, post_delete
+from django.db import transaction
+from django.db.models import FileField
+from django.db.models.fields.files import FieldFile
+from django.db.models.signals import post_save, post_delete
+
+from core.storage import restore_missing_file
+from core.tasks import run_in_background
+
+
+class TrackChangesMixin:
+    """
+    Model mixin that remembers the values of 'tracked_fields' as they were
+    loaded from the database (and again after every save), so saves and
+    signal receivers can tell what changed without re-reading the row.
+    File fields are remembered by their file name.
+    Usage: class Review(TrackChangesMixin, models.Model): tracked_fields = ('rating',)
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_tracked_fields()
+        return instance
+
+    def snapshot_tracked_fields(self):
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            name: self.get_tracked_value(name) for name in self.tracked_fields if name not in deferred
+        }
+
+    def get_tracked_value(self, name):
+        """
+        Returns the current value of a tracked field, or the name of its file.
+        """
+        value = getattr(self, name)
+        if isinstance(value, FieldFile):
+            return value.name or ''
+        return value
+
+    def get_loaded_value(self, name, default=None):
+        """
+        Returns the last loaded or saved value of a tracked field, or
+        'default' for instances that were never loaded or saved.
+        """
+        return getattr(self, '_loaded_values', {}).get(name, default)
+
+    def has_field_changed(self, name):
+        """
+        Returns True if a tracked field differs from its loaded value.
+        """
+        loaded_values = getattr(self, '_loaded_values', {})
+        return name in loaded_values and loaded_values[name] != self.get_tracked_value(name)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.snapshot_tracked_fields()
 
 
 def overwrite_file_upload(instance, filename):
     """
-    Custom upload_to function that deletes old file when uploading new one.
-    Usage: image = models.ImageField(upload_to=overwrite_file_upload)
+    Former upload_to function, superseded by core.storage.content_addressed_upload.
+
+    Kept because older migrations reference it. It only builds the path
+    '<model>s/<pk>/<filename>' and never deletes files, since content
+    addressed files may be shared by several records.
     """
-    # Get the model name and instance pk for unique path
     model_name = instance.__class__.__name__.lower()
-    
-    # Create directory structure
-    upload_path = f"{model_name}s/{instance.pk or 'temp'}"
-    
-    # If instance has pk (existing object), delete old file
-    if instance.pk:
-        try:
-            old_instance = instance.__class__.objects.get(pk=instance.pk)
-            # Check if the field that's being updated has a file
-            for field in instance._meta.fields:
-                if hasattr(field, 'upload_to') and hasattr(old_instance, field.name):
-                    old_file = getattr(old_instance, field.name)
-                    if old_file and default_storage.exists(old_file.name):
-                        default_storage.delete(old_file.name)
-        except instance.__class__.DoesNotExist:
-            pass
-    
-    return f"{upload_path}/{filename}"
-
-
-@receiver(post_delete)
-def delete_file_on_delete(sender, instance, **kwargs):
-    """
-    Signal to delete file when model instance is deleted.
+    return f"{model_name}s/{instance.pk or 'temp'}/{filename}"
+
+
+def delete_file_on_delete(sender, instance, using='default', **kwargs):
+    """
+    Signal receiver that deletes the files of a deleted model instance.
+
+    Connected only to models with file fields (see register_file_cleanup).
+    The files are removed by a background task once the transaction commits,
+    so a cascading delete does no filesystem work inside the request and a
+    rolled back delete keeps its files.
     """
     for field in instance._meta.fields:
-        if hasattr(field, 'upload_to'):
+        if isinstance(field, FileField):
             file_field = getattr(instance, field.name)
-            if file_field and default_storage.exists(file_field.name):
-                default_storage.delete(file_field.name)
\ No newline at end of file
+            if file_field:
+                queue_file_deletion(sender, field.name, file_field.name, [file_field.name], using=using)
+
+
+def delete_file_on_change(sender, instance, created=False, using='default', **kwargs):
+    """
+    Signal receiver that deletes the file a saved instance was loaded with,
+    if one of its file fields now holds another file.
+    """
+    if created or not isinstance(instance, TrackChangesMixin):
+        return
+    for field in instance._meta.fields:
+        if isinstance(field, FileField) and instance.has_field_changed(field.name):
+            old_name = instance.get_loaded_value(field.name)
+            if old_name:
+                queue_file_deletion(sender, field.name, old_name, [old_name], using=using)
+
+
+def queue_file_deletion(model, field_name, source_name, names, using='default'):
+    """
+    Deletes the files 'names' in the background once the transaction commits,
+    unless a row of 'model' then still holds 'source_name' in 'field_name'.
+
+    'names' are the stored file itself or files derived from it; the check
+    keeps files that are shared between rows (see core.storage).
+    """
+    names = list(names)
+    if names:
+        transaction.on_commit(
+            lambda: run_in_background(delete_unreferenced_files, model, field_name, source_name, names, using),
+            using=using)
+
+
+def delete_unreferenced_files(model, field_name, source_name, names, using='default'):
+    """
+    Deletes the files 'names' unless a row of 'model' holds 'source_name' in 'field_name'.
+
+    The reference is checked again right before each file is deleted, so a
+    row committed meanwhile keeps the remaining files. An upload of the same
+    content that is still uncommitted writes its file again after commit
+    (see restore_reused_files).
+    """
+    rows = model._default_manager.using(using).filter(**{field_name: source_name})
+    storage = model._meta.get_field(field_name).storage
+    for name in names:
+        if rows.exists():
+            return
+        storage.delete(name)
+
+
+def restore_reused_files(sender, instance, using='default', **kwargs):
+    """
+    Signal receiver that, once the saved row is committed, writes back
+    content-addressed files that were reused by the save but deleted since.
+    """
+    for field_name in list(instance.__dict__.get('_reused_file_contents', {})):
+        transaction.on_commit(lambda field_name=field_name: restore_missing_file(instance, field_name), using=using)
+
+
+def register_file_cleanup(*models):
+    """
+    Connects the receivers that delete replaced and orphaned files of the given models.
+    """
+    for model in models:
+        post_save.connect(
+            delete_file_on_change, sender=model, dispatch_uid=f'delete_file_on_change:{model._meta.label}')
+        post_save.connect(
+            restore_reused_files, sender=model, dispatch_uid=f'restore_reused_files:{model._meta.label}')
+        post_delete.connect(
+            delete_file_on_delete, sender=model, dispatch_uid=f'delete_file_on_delete:{model._meta.label}')
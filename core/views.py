@@ -0,0 +1,72 @@
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from core.serializers import SparseFieldsetMixin, ValuesSerializer, resolve_field_path
+
+
+class SparseFieldsetViewMixin:
+    """
+    View mixin that loads only the columns a sparse fieldset reads.
+
+    On read requests whose serializer uses SparseFieldsetMixin and was
+    trimmed by '?fields=' or '?omit=', the filtered queryset is limited
+    with only() to the model field paths of the remaining fields, plus
+    'sparse_required_fields' (columns the view itself reads from the
+    instances, e.g. for cursors). select_related() is reset to the
+    relations those paths traverse, so dropped relations are not joined.
+    Prefetches are left alone.
+    """
+    sparse_required_fields = []
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        params = self.request.query_params
+        sparse_params = [SparseFieldsetMixin.fields_param, SparseFieldsetMixin.omit_param]
+        if self.request.method not in SAFE_METHODS or not any(param in params for param in sparse_params):
+            return queryset
+        serializer = self.get_serializer()
+        if not isinstance(serializer, SparseFieldsetMixin) or serializer.selected_field_names is None:
+            return queryset
+        paths = serializer.get_model_field_paths()
+        if paths is None:
+            return queryset
+        paths |= set(self.sparse_required_fields)
+        relations = {resolve_field_path(queryset.model, path) for path in paths} - {'', None}
+        queryset = queryset.select_related(None).only(*paths)
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset
+
+
+class FastListMixin:
+    """
+    View mixin that serves list actions from .values() rows.
+
+    The list serializer is compiled into a ValuesSerializer, the filtered
+    queryset is read with values() and each page is turned into plain
+    dicts, which render to the same bytes as the regular serializer
+    output. Set 'fast_list' to False to use the regular serializers; the
+    view also falls back to them when the serializer has fields the fast
+    path cannot map or the request uses a format suffix.
+    """
+    fast_list = True
+
+    def get_values_serializer(self):
+        """
+        Returns the compiled list serializer, or None to use the regular path.
+        """
+        if not self.fast_list or self.format_kwarg:
+            return None
+        return ValuesSerializer.build(self.get_serializer())
+
+    def list(self, request, *args, **kwargs):
+        values_serializer = self.get_values_serializer()
+        if values_serializer is None:
+            return super().list(request, *args, **kwargs)
+
+        paths = values_serializer.paths | set(getattr(self, 'sparse_required_fields', []))
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).values(*paths)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(values_serializer.serialize(page))
+        return Response(values_serializer.serialize(queryset))